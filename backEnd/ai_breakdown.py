@@ -0,0 +1,82 @@
+# backEnd/ai_breakdown.py
+# Prompt packing and parsing for POST /ai/breakdown/batch. Many tasks go into
+# as few upstream requests as the token budget allows; each request asks for
+# JSON so subtasks come back structured, keyed by the task's position.
+import json
+import os
+from typing import Dict, List
+
+AI_BATCH_MAX_TASKS = int(os.getenv("AI_BATCH_MAX_TASKS", "50"))
+AI_BATCH_INPUT_TOKENS = int(os.getenv("AI_BATCH_INPUT_TOKENS", "3000"))    # prompt budget per request
+AI_BATCH_OUTPUT_TOKENS = int(os.getenv("AI_BATCH_OUTPUT_TOKENS", "2000"))  # completion budget per request
+AI_BATCH_TOKENS_PER_TASK = int(os.getenv("AI_BATCH_TOKENS_PER_TASK", "120"))  # ~5 short subtasks + JSON
+
+SYSTEM_PROMPT = (
+    "You are an assistant that breaks tasks into subtasks. For every task you "
+    "are given, write 3-5 short, actionable subtasks. Reply with JSON only, in "
+    'the form {"results": [{"id": <task id>, "subtasks": ["...", "..."]}]}, '
+    "with exactly one entry per task id."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; close enough for budgeting
+    # and avoids shipping a tokenizer
+    return len(text) // 4 + 1
+
+
+_PROMPT_OVERHEAD = estimate_tokens(SYSTEM_PROMPT) + 16  # message framing
+
+
+def pack(tasks: List[str]) -> List[List[int]]:
+    """
+    Greedily group task indexes, in order, so that each group's prompt fits
+    AI_BATCH_INPUT_TOKENS and its expected answer fits AI_BATCH_OUTPUT_TOKENS.
+    A single task over budget still gets a group of its own.
+    """
+    per_request = max(1, AI_BATCH_OUTPUT_TOKENS // AI_BATCH_TOKENS_PER_TASK)
+    groups: List[List[int]] = []
+    current: List[int] = []
+    used = _PROMPT_OVERHEAD
+    for i, task in enumerate(tasks):
+        cost = estimate_tokens(task) + 4  # "[n] " prefix and newline
+        if current and (used + cost > AI_BATCH_INPUT_TOKENS or len(current) >= per_request):
+            groups.append(current)
+            current, used = [], _PROMPT_OVERHEAD
+        current.append(i)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def build_messages(tasks: List[str]) -> List[Dict[str, str]]:
+    listing = "\n".join(f"[{n}] {' '.join(task.split())}" for n, task in enumerate(tasks))
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Tasks:\n{listing}"},
+    ]
+
+
+def max_tokens_for(n_tasks: int) -> int:
+    return min(AI_BATCH_OUTPUT_TOKENS, n_tasks * AI_BATCH_TOKENS_PER_TASK + 50)
+
+
+def parse_breakdown(text: str) -> Dict[int, List[str]]:
+    """Task id -> subtasks. Raises ValueError if the reply is not the JSON we asked for."""
+    data = json.loads(text or "")
+    items = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        raise ValueError("missing 'results' list")
+    out: Dict[int, List[str]] = {}
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("subtasks"), list):
+            continue
+        try:
+            task_id = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        subtasks = [s.strip() for s in item["subtasks"] if isinstance(s, str) and s.strip()]
+        if subtasks:
+            out[task_id] = subtasks
+    return out
@@ -0,0 +1,147 @@
+# backEnd/ai_cache.py
+# Response cache for the non-streaming AI routes. Keys are a hash of
+# (model, normalized messages, sampling params), values the JSON body we
+# returned. Lookup order: in-process LRU -> optional shared backend -> upstream,
+# and concurrent misses on the same key share one upstream call.
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Tuple
+
+from .ttl_cache import TTLCache
+
+log = logging.getLogger(__name__)
+
+AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "1000"))                      # entries; 0 disables
+AI_CACHE_MAX_BYTES = int(os.getenv("AI_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "3600"))
+AI_CACHE_REDIS_URL = os.getenv("AI_CACHE_REDIS_URL")                         # shared backend, optional
+
+
+def _normalize(text: str) -> str:
+    # "Plan trip " and "plan  trip" are the same question to us; casing is kept
+    return " ".join(text.split())
+
+
+def cache_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+    payload = {
+        "model": model,
+        "messages": [{"role": m["role"], "content": _normalize(m["content"])} for m in messages],
+        "params": params,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return "ai:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(Protocol):
+    """A shared store (Redis, memcached, ...) several workers can read."""
+
+    async def get(self, key: str) -> Optional[str]: ...
+
+    async def set(self, key: str, value: str, ttl: float) -> None: ...
+
+
+class RedisBackend:
+    def __init__(self, url: str) -> None:
+        import redis.asyncio as redis  # optional dependency, only needed when configured
+
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[str]:
+        raw = await self._redis.get(key)
+        return raw.decode("utf-8") if raw is not None else None
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self._redis.set(key, value, ex=max(int(ttl), 1))
+
+
+class AICache:
+    def __init__(self, memory: TTLCache[str], shared: Optional[CacheBackend] = None) -> None:
+        self.memory = memory
+        self.shared = shared
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+        self.stats = {"hits": 0, "shared_hits": 0, "misses": 0, "coalesced": 0, "bypasses": 0}
+
+    async def _lookup(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["hits"] += 1
+            return value
+        if self.shared is not None:
+            try:
+                value = await self.shared.get(key)
+            except Exception:  # a flaky cache must never fail the request
+                log.warning("ai cache: shared backend get failed", exc_info=True)
+                value = None
+            if value is not None:
+                self.stats["shared_hits"] += 1
+                self.memory.set(key, value)
+                return value
+        return None
+
+    async def _store(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, value, self.memory.ttl)
+            except Exception:
+                log.warning("ai cache: shared backend set failed", exc_info=True)
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]], bypass: bool = False
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Returns (body, status) with status one of HIT, MISS, COALESCED, BYPASS.
+        `bypass` skips the lookup but still refreshes the cache with the result.
+        """
+        if bypass:
+            self.stats["bypasses"] += 1
+        else:
+            cached = await self._lookup(key)
+            if cached is not None:
+                return json.loads(cached), "HIT"
+
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.stats["coalesced"] += 1
+                return json.loads(await asyncio.shield(pending)), "COALESCED"
+            self.stats["misses"] += 1
+
+        fut: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        if not bypass:
+            self._inflight[key] = fut
+        try:
+            body = await compute()
+            encoded = json.dumps(body)
+            await self._store(key, encoded)
+            fut.set_result(encoded)
+            return body, "BYPASS" if bypass else "MISS"
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved, so lone failures don't log "never retrieved"
+            raise
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries": len(self.memory),
+            "bytes": self.memory.bytes,
+            "inflight": len(self._inflight),
+            "shared_backend": type(self.shared).__name__ if self.shared else None,
+        }
+
+
+ai_cache = AICache(
+    memory=TTLCache(maxsize=AI_CACHE_SIZE, ttl=AI_CACHE_TTL, max_bytes=AI_CACHE_MAX_BYTES, sizeof=len),
+    shared=RedisBackend(AI_CACHE_REDIS_URL) if AI_CACHE_REDIS_URL else None,
+)
+
+
+def wants_bypass(headers) -> bool:
+    """`Cache-Control: no-cache` or `X-Cache-Bypass: 1` on the request skips the lookup."""
+    return "no-cache" in headers.get("cache-control", "").lower() or headers.get("x-cache-bypass") in ("1", "true")
@@ -0,0 +1,155 @@
+# backEnd/ai_limits.py
+# Guard rails around upstream LLM calls: a bounded concurrency gate with a
+# short waiting line, per-attempt timeouts, and jittered retries on 429/5xx.
+# Everything here is asyncio-only; the AI routes are async def and never
+# borrow a threadpool worker, so a slow upstream cannot starve /todos.
+import asyncio
+import contextlib
+import logging
+import os
+import random
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from .metrics import timed
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "16"))   # upstream calls in flight
+AI_MAX_QUEUE = int(os.getenv("AI_MAX_QUEUE", "32"))               # callers allowed to wait for a slot
+AI_QUEUE_TIMEOUT = float(os.getenv("AI_QUEUE_TIMEOUT", "2"))      # seconds a caller may wait
+AI_TIMEOUT = float(os.getenv("AI_TIMEOUT", "30"))                 # per attempt
+AI_TOTAL_TIMEOUT = float(os.getenv("AI_TOTAL_TIMEOUT", "60"))     # all attempts + backoff
+AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "2"))
+AI_BACKOFF_BASE = float(os.getenv("AI_BACKOFF_BASE", "0.5"))
+AI_BACKOFF_CAP = float(os.getenv("AI_BACKOFF_CAP", "8"))
+
+
+class AIError(Exception):
+    """An upstream failure already mapped to the status code we answer with."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AIGate:
+    """
+    At most `limit` upstream calls at once and at most `max_queue` callers
+    waiting behind them; anyone beyond that, or anyone who waits longer than
+    `queue_timeout`, is turned away immediately with a 503.
+    """
+
+    def __init__(self, limit: int, max_queue: int, queue_timeout: float) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._sem = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.in_flight = 0
+        self.stats = {"admitted": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._sem.locked():
+            if self.waiting >= self.max_queue:
+                self.stats["rejected_queue_full"] += 1
+                raise AIError(503, "AI service is busy, please retry", retry_after=1)
+            self.waiting += 1
+            try:
+                with timed("llm_queue_wait"):
+                    await asyncio.wait_for(self._sem.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.stats["rejected_timeout"] += 1
+                raise AIError(503, "AI service is busy, please retry", retry_after=1)
+            finally:
+                self.waiting -= 1
+        else:
+            await self._sem.acquire()
+        self.stats["admitted"] += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._sem.release()
+
+
+ai_gate = AIGate(AI_MAX_CONCURRENCY, AI_MAX_QUEUE, AI_QUEUE_TIMEOUT)
+
+
+# `openai` is imported inside these helpers rather than at the top: they only
+# run after an upstream call, by which point the SDK is already loaded.
+
+def _retryable(e: Exception) -> bool:
+    import openai
+    if isinstance(e, (openai.APITimeoutError, openai.APIConnectionError, asyncio.TimeoutError)):
+        return True
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code == 429 or e.status_code >= 500
+    return False
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    response = getattr(e, "response", None)
+    raw = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(raw) if raw is not None else None
+    except ValueError:
+        return None
+
+
+def _as_ai_error(e: Exception) -> AIError:
+    if isinstance(e, AIError):
+        return e
+    import openai
+    if isinstance(e, (openai.APITimeoutError, asyncio.TimeoutError)):
+        return AIError(504, "AI service timed out")
+    if isinstance(e, openai.APIConnectionError):
+        return AIError(502, "Could not reach the AI service")
+    if isinstance(e, openai.APIStatusError):
+        if e.status_code == 429:
+            return AIError(503, "AI service is rate limited, please retry", retry_after=int(_retry_after(e) or 1))
+        return AIError(502, f"AI service error ({e.status_code})")
+    return AIError(500, str(e))
+
+
+async def with_retries(make_call: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run `make_call` with a per-attempt timeout and retries on 429/5xx/timeouts.
+    Backoff is "full jitter" (uniform in [0, base * 2**attempt], capped),
+    stretched to honour a Retry-After header, and never sleeps past
+    AI_TOTAL_TIMEOUT. Failures come out as AIError.
+    """
+    deadline = time.monotonic() + AI_TOTAL_TIMEOUT
+    attempt = 0
+    while True:
+        try:
+            remaining = deadline - time.monotonic()
+            with timed("llm_call"):
+                return await asyncio.wait_for(make_call(), min(AI_TIMEOUT, max(remaining, 0.001)))
+        except Exception as e:
+            if not _retryable(e) or attempt >= AI_MAX_RETRIES:
+                raise _as_ai_error(e) from e
+            delay = random.uniform(0, min(AI_BACKOFF_CAP, AI_BACKOFF_BASE * 2 ** attempt))
+            delay = max(delay, _retry_after(e) or 0)
+            if time.monotonic() + delay >= deadline:
+                raise _as_ai_error(e) from e
+            attempt += 1
+            log.warning("AI call failed (%s); retry %d in %.2fs", type(e).__name__, attempt, delay)
+            await asyncio.sleep(delay)
+
+
+async def call_upstream(make_call: Callable[[], Awaitable[T]]) -> T:
+    """with_retries inside a gate slot; the slot is held across retries."""
+    async with ai_gate.slot():
+        return await with_retries(make_call)
+
+
+def gate_snapshot() -> dict:
+    return {**ai_gate.stats, "in_flight": ai_gate.in_flight, "waiting": ai_gate.waiting,
+            "limit": ai_gate.limit, "max_queue": ai_gate.max_queue}
@@ -1,13 +1,52 @@
 # backEnd/ai_routes.py
-from typing import List, Literal, Dict, Any
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from openai import OpenAI
+from typing import List, Literal, Dict, Any, AsyncIterator, Awaitable, Callable, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+import asyncio
+import contextlib
+import json
+import logging
 import os
+import time
+
+from .ai_cache import ai_cache, cache_key, wants_bypass
+from .ai_limits import AIError, AI_TIMEOUT, ai_gate, call_upstream, with_retries
+from .ai_breakdown import AI_BATCH_MAX_TASKS, pack, build_messages, max_tokens_for, parse_breakdown
+from .auth_utils import Principal
+from .crud import apply_batch
+from .deps import current_user
+from .metrics import SPAN_SECONDS
+from .schemas import Todo, TodoBatchOp, TODO_BATCH_MAX
 
 router = APIRouter(prefix="/ai", tags=["ai"])
+log = logging.getLogger(__name__)
+
+# Built on first use: importing the SDK is a large share of cold start, and a
+# missing OPENAI_API_KEY should only break the AI routes, not app import.
+# Honours OPENAI_BASE_URL, so a local fake server (benchmarks/fake_openai.py)
+# can stand in for the real API. Retries are ours (ai_limits.with_retries),
+# so the SDK's own are off.
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        from openai import AsyncOpenAI, OpenAIError
+        try:
+            _client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), timeout=AI_TIMEOUT, max_retries=0)
+        except OpenAIError as e:
+            raise AIError(503, "AI service is not configured") from e
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
 
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
 class TaskInput(BaseModel):
     task: str
@@ -19,50 +58,215 @@ class Msg(BaseModel):
 class ChatBody(BaseModel):
     messages: List[Msg]
 
+class BreakdownBatchBody(BaseModel):
+    tasks: List[str] = Field(min_length=1, max_length=AI_BATCH_MAX_TASKS)
+    persist: bool = False  # also save every subtask as a todo
 
-@router.post("/chat")
-def chat(body: ChatBody) -> Dict[str, Any]:
+class TaskBreakdown(BaseModel):
+    task: str
+    subtasks: List[str] = []
+    todos: Optional[List[Todo]] = None  # set when persist=true
+    error: Optional[str] = None
+
+class BreakdownBatchResponse(BaseModel):
+    results: List[TaskBreakdown]
+    upstream_requests: int
+
+
+def http_error(e: AIError) -> HTTPException:
+    headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+
+
+MODEL = "gpt-4o-mini"
+
+
+async def cached_completion(
+    request: Request, response: Response, messages: List[Dict[str, str]], temperature: float,
+    shape: Callable[[str], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Run a chat completion through ai_cache and return shape(text)."""
+    async def compute() -> Dict[str, Any]:
+        resp = await call_upstream(lambda: get_client().chat.completions.create(
+            model=MODEL, messages=messages, temperature=temperature,
+        ))
+        return shape(resp.choices[0].message.content)
+
+    key = cache_key(MODEL, messages, {"temperature": temperature})
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[m.model_dump() for m in body.messages],
-            temperature=0.7,
-        )
-        text = resp.choices[0].message.content
-        return {"message": text}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        body, status = await ai_cache.get_or_compute(key, compute, bypass=wants_bypass(request.headers))
+    except AIError as e:
+        raise http_error(e)
+    response.headers["X-Cache"] = status
+    return body
+
+
+@router.post("/chat")
+async def chat(body: ChatBody, request: Request, response: Response) -> Dict[str, Any]:
+    return await cached_completion(
+        request, response,
+        messages=[m.model_dump() for m in body.messages],
+        temperature=0.7,
+        shape=lambda text: {"message": text},
+    )
+
 
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    Runs `on_close` however the response ends, including when the client is
+    gone before the body iterator ever starts (its `finally` would not run).
+    """
+
+    def __init__(self, *args: Any, on_close: Callable[[], Awaitable[None]], **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._on_close()
+
+
+def sse(data: str, event: str = "") -> str:
+    # JSON-encode the payload so leading spaces and newlines in tokens survive
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
 
-@router.post("/chat-stream")
-def chat_stream(body: ChatBody):
-    """Example of streaming responses."""
+
+@router.post("/chat/stream")
+@router.post("/chat-stream", include_in_schema=False)  # old path, kept for existing callers
+async def chat_stream(body: ChatBody, request: Request):
+    """
+    Stream the completion as server-sent events: one `data: "<token>"` frame
+    per delta, then `data: [DONE]`. If the client goes away the upstream
+    request is closed too, so we stop paying for tokens nobody will read.
+    """
+    started = time.perf_counter()
+    # the gate slot is held for the whole stream, not just the opening call
+    slot = contextlib.AsyncExitStack()
     try:
-        with client.chat.completions.stream(
-            model="gpt-4o-mini",
+        await slot.enter_async_context(ai_gate.slot())
+        # open the upstream stream before answering, so connect/auth
+        # failures are still a proper HTTP error rather than a broken stream
+        upstream = await with_retries(lambda: get_client().chat.completions.create(
+            model=MODEL,
             messages=[m.model_dump() for m in body.messages],
-        ) as stream:
-            for event in stream:
-                if event.type == "message.delta" and event.delta.get("content"):
-                    yield event.delta["content"]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+            stream=True,
+        ))
+    except AIError as e:
+        await slot.aclose()
+        raise http_error(e)
+    slot.push_async_callback(upstream.close)  # drops the upstream HTTP response (cancels generation)
+
+    async def events() -> AsyncIterator[str]:
+        ttft = None
+        chunks = 0
+        try:
+            async for chunk in upstream:
+                if await request.is_disconnected():
+                    log.info("chat-stream: client disconnected after %d chunks", chunks)
+                    break
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                    SPAN_SECONDS.observe(ttft, span="llm_ttft")
+                chunks += 1
+                yield sse(delta)
+            else:
+                yield "data: [DONE]\n\n"
+        except Exception as e:  # headers are already sent; report in-band
+            log.exception("chat-stream: upstream failed")
+            yield sse(str(e), event="error")
+        finally:
+            await slot.aclose()
+            log.info(
+                "chat-stream ttft=%s total=%.3fs chunks=%d",
+                f"{ttft:.3f}s" if ttft is not None else "-", time.perf_counter() - started, chunks,
+            )
+
+    return ClosingStreamingResponse(
+        events(),
+        on_close=slot.aclose,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # no proxy buffering
+    )
 
 @router.post("/breakdown")
-def breakdown_task(body: TaskInput) -> Dict[str, Any]:
+async def breakdown_task(body: TaskInput, request: Request, response: Response) -> Dict[str, Any]:
     """
     Take one todo task and return 3–5 suggested subtasks.
     """
+    return await cached_completion(
+        request, response,
+        messages=[
+            {"role": "system", "content": "You are an assistant that breaks tasks into subtasks."},
+            {"role": "user", "content": f"Break this task into 3-5 actionable subtasks:\n{body.task}"}
+        ],
+        temperature=0.7,
+        shape=lambda text: {"subtasks": text},
+    )
+
+
+async def breakdown_group(tasks: List[str]) -> Dict[int, List[str]]:
+    """One upstream request for a packed group of tasks."""
+    resp = await call_upstream(lambda: get_client().chat.completions.create(
+        model=MODEL,
+        messages=build_messages(tasks),
+        temperature=0.7,
+        max_tokens=max_tokens_for(len(tasks)),
+        response_format={"type": "json_object"},
+    ))
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an assistant that breaks tasks into subtasks."},
-                {"role": "user", "content": f"Break this task into 3-5 actionable subtasks:\n{body.task}"}
-            ],
-            temperature=0.7,
-        )
-        text = resp.choices[0].message.content
-        return {"subtasks": text}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        return parse_breakdown(resp.choices[0].message.content)
+    except ValueError as e:
+        raise AIError(502, f"AI returned malformed subtasks: {e}")
+
+
+@router.post("/breakdown/batch", response_model=BreakdownBatchResponse)
+async def breakdown_batch(body: BreakdownBatchBody, user: Principal = Depends(current_user)):
+    """
+    Break down many tasks at once. Tasks are packed into as few upstream
+    requests as the token budget allows (ai_breakdown.pack) and the groups
+    run concurrently, still bounded by the AI gate. With persist=true every
+    subtask is also inserted as a todo, all in one bulk INSERT.
+    """
+    groups = pack(body.tasks)
+    outcomes = await asyncio.gather(
+        *(breakdown_group([body.tasks[i] for i in g]) for g in groups), return_exceptions=True
+    )
+
+    results = [TaskBreakdown(task=t) for t in body.tasks]
+    errors: List[AIError] = []
+    for group, outcome in zip(groups, outcomes):
+        if isinstance(outcome, AIError):
+            errors.append(outcome)
+            for i in group:
+                results[i].error = outcome.detail
+            continue
+        if isinstance(outcome, BaseException):
+            raise outcome
+        for local_id, i in enumerate(group):
+            subtasks = outcome.get(local_id)
+            if subtasks:
+                results[i].subtasks = subtasks
+            else:
+                results[i].error = "No subtasks returned for this task"
+
+    if len(errors) == len(groups):  # nothing worked: answer with the upstream status
+        raise http_error(errors[0])
+
+    if body.persist:
+        titles = [(i, s) for i, r in enumerate(results) for s in r.subtasks]
+        if len(titles) > TODO_BATCH_MAX:
+            raise HTTPException(status_code=400, detail=f"Too many subtasks to save at once (max {TODO_BATCH_MAX})")
+        if titles:
+            created = await apply_batch(user.id, [TodoBatchOp(op="create", title=s) for _, s in titles])
+            for (i, _), res in zip(titles, created["results"]):
+                results[i].todos = (results[i].todos or []) + [Todo(**res["todo"])]
+
+    return {"results": results, "upstream_requests": len(groups)}
@@ -0,0 +1,178 @@
+# backEnd/async_routes.py
+# async def versions of the auth and todo handlers, mounted by main.py when
+# DB_MODE=async. They speak to the same tables through AsyncSession, so the
+# two modes can be A/B'd against one database.
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .validators import validate_password_or_400
+from .models import Todo as TodoModel
+from .schemas import (
+    UserCreate, UserLogin, UserOut, Token,
+    Todo as TodoSchema, TodoCreate, TodoUpdate, TodoPage, TodoDelta, TodoSearchPage, TodoBatch, TodoBatchResponse,
+)
+from .search import search_terms, search_stmt, search_page, SEARCH_PAGE_DEFAULT, SEARCH_PAGE_MAX, SEARCH_MAX_OFFSET
+from .deps import get_async_db, get_current_user_async
+from .auth_utils import create_access_token, Principal
+from .hashing import hash_pool
+from .metrics import timed
+from .fast_json import FastJSONResponse
+from .crud import (
+    todos_page_stmt, todos_page, stream_todos_page_async, owned_todo_stmt, todo_dict, run_batch_async,
+    TODOS_PAGE_DEFAULT, TODOS_PAGE_MAX, TODOS_STREAM_MAX,
+    bump_version_stmt, user_version_stmt, version_or_401, etag_for, etag_matches, list_headers, todos_delta_stmt, todos_delta,
+    tombstone_floor_stmt, purge_tombstones_async,
+)
+
+auth_router = APIRouter(prefix="/auth", tags=["auth"])
+todos_router = APIRouter(tags=["todos"])
+
+
+# -------- Auth --------
+# bcrypt runs in the hash pool (hashing.py), never on the event loop.
+
+@auth_router.post("/signup", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+async def signup(body: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    validate_password_or_400(body.password)
+
+    email = body.email.strip().lower()
+    existing = await db.execute(select(models.User.id).where(models.User.email == email))
+    if existing.first():
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    with timed("password_hash"):
+        hashed = await hash_pool.hash_async(body.password)
+    user = models.User(email=email, hashed_password=hashed)
+    db.add(user)
+    await db.commit()
+
+    return user
+
+
+@auth_router.post("/login", response_model=Token)
+async def login(body: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    email = body.email.strip().lower()
+    user = (await db.execute(select(models.User).where(models.User.email == email))).scalars().first()
+
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    with timed("password_verify"):
+        ok, new_hash = await hash_pool.verify_and_update_async(body.password, user.hashed_password)
+    if not ok:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    if new_hash:  # stored hash was made with an old BCRYPT_ROUNDS; upgrade it now
+        user.hashed_password = new_hash
+        await db.commit()
+
+    token = create_access_token({"sub": user.email, "uid": user.id, "tv": user.token_version})
+    return {"access_token": token, "token_type": "bearer"}
+
+
+# -------- Todos --------
+
+@todos_router.get("/todos", response_model=Union[TodoPage, TodoDelta])
+async def get_todos(
+    request: Request,
+    limit: int = Query(TODOS_PAGE_DEFAULT, ge=1, le=TODOS_STREAM_MAX,
+                       description=f"pages above {TODOS_PAGE_MAX} are streamed"),
+    after: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    done: Optional[bool] = None,
+    since: Optional[int] = Query(None, ge=0, description="version from an earlier response; returns only changes"),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    version = version_or_401(await db.execute(user_version_stmt(user.id)))
+    etag = etag_for(user.id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=list_headers(etag))
+    headers = list_headers(etag)
+
+    if since is not None:
+        # tombstones below the floor are gone, so an older client can't be caught up
+        floor = version_or_401(await db.execute(tombstone_floor_stmt(user.id)))
+        rows = (await db.execute(todos_delta_stmt(user.id, since))).all() if since >= floor else []
+        return FastJSONResponse(todos_delta(rows, version, resync=since < floor), headers=headers)
+    stmt = todos_page_stmt(user.id, limit, after, done)
+    if limit > TODOS_PAGE_MAX:
+        return StreamingResponse(stream_todos_page_async(stmt, limit, version),
+                                 media_type="application/json", headers=headers)
+    rows = (await db.execute(stmt)).all()
+    return FastJSONResponse(todos_page(rows, limit, version), headers=headers)
+
+
+@todos_router.get("/todos/search", response_model=TodoSearchPage)
+async def search_todos(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(SEARCH_PAGE_DEFAULT, ge=1, le=SEARCH_PAGE_MAX),
+    offset: int = Query(0, ge=0, le=SEARCH_MAX_OFFSET),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    terms = search_terms(q)
+    if not terms:
+        return {"items": [], "next_offset": None}
+    rows = (await db.execute(search_stmt(user.id, terms, limit, offset))).all()
+    return FastJSONResponse(search_page(rows, limit, offset))
+
+
+@todos_router.post("/todos", response_model=TodoSchema, status_code=status.HTTP_201_CREATED)
+async def add_todo(
+    todo: TodoCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    version = version_or_401(await db.execute(bump_version_stmt(user.id)))
+    new_todo = TodoModel(title=todo.title, done=todo.done, user_id=user.id, version=version)
+    db.add(new_todo)
+    await db.commit()  # id is populated by the flush; no refresh round-trip needed
+    return todo_dict(new_todo)
+
+
+@todos_router.post("/todos/batch", response_model=TodoBatchResponse)
+async def batch_todos(
+    body: TodoBatch,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    return await run_batch_async(db, user.id, body.ops)
+
+
+@todos_router.patch("/todos/{todo_id}", response_model=TodoSchema)
+async def update_todo(
+    todo_id: int,
+    body: TodoUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    todo = (await db.execute(owned_todo_stmt(todo_id, user.id))).scalars().first()
+    if not todo:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    if body.title is not None:
+        todo.title = body.title
+    if body.done is not None:
+        todo.done = body.done
+    todo.version = version_or_401(await db.execute(bump_version_stmt(user.id)))
+    await db.commit()
+    return todo_dict(todo)
+
+
+@todos_router.delete("/todos/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_todo(
+    todo_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    todo = (await db.execute(owned_todo_stmt(todo_id, user.id))).scalars().first()
+    if not todo:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    # tombstone, so ?since= clients learn about the delete
+    todo.deleted, todo.title = True, ""
+    todo.version = version_or_401(await db.execute(bump_version_stmt(user.id)))
+    await purge_tombstones_async(db, user.id, todo.version)
+    await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -5,7 +5,9 @@ from .validators import validate_password_or_400
 from . import models, schemas
 from .deps import get_db
 from .schemas import UserCreate, UserLogin, UserOut, Token
-from .auth_utils import hash_password, verify_password, create_access_token
+from .auth_utils import create_access_token
+from .hashing import hash_pool
+from .metrics import timed
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -17,7 +19,9 @@ def signup(body: UserCreate, db: Session = Depends(get_db)):
     if db.query(models.User).filter(models.User.email == email).first():
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = models.User(email=email, hashed_password=hash_password(body.password))
+    with timed("password_hash"):
+        hashed = hash_pool.hash(body.password)
+    user = models.User(email=email, hashed_password=hashed)
     db.add(user)
     db.commit()
     db.refresh(user)
@@ -30,8 +34,15 @@ def login(body: UserLogin, db: Session = Depends(get_db)):
     email = body.email.strip().lower()
     user = db.query(models.User).filter(models.User.email == email).first()
 
-    if not user or not verify_password(body.password, user.hashed_password):
+    if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
+    with timed("password_verify"):
+        ok, new_hash = hash_pool.verify_and_update(body.password, user.hashed_password)
+    if not ok:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    if new_hash:  # stored hash was made with an old BCRYPT_ROUNDS; upgrade it now
+        user.hashed_password = new_hash
+        db.commit()
 
-    token = create_access_token({"sub": user.email})
+    token = create_access_token({"sub": user.email, "uid": user.id, "tv": user.token_version})
     return {"access_token": token, "token_type": "bearer"}
@@ -1,29 +1,84 @@
 # backend/auth_utils.py
+import os
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
-from passlib.context import CryptContext
 from jose import jwt, JWTError
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .ttl_cache import TTLCache
+from .metrics import timed
 
 SECRET_KEY = "change-me-to-a-random-long-string"  # put in env in real apps
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+# verified token -> Principal, so hot routes skip both the JWT verify and the
+# users lookup. Size 0 disables the cache (every request decodes the JWT and
+# checks the users row).
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "300"))
 
 def create_access_token(data: Dict[str, Any], expires_minutes: int = ACCESS_TOKEN_EXPIRE_MINUTES) -> str:
     to_encode = data.copy()
-    expire = datetime.now(tz=timezone.utc) + timedelta(minutes=expires_minutes)
-    to_encode.update({"exp": expire})
+    now = datetime.now(tz=timezone.utc)
+    expire = now + timedelta(minutes=expires_minutes)
+    to_encode.update({"exp": expire, "iat": int(now.timestamp())})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with timed("jwt_decode"):
+            return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
+
+
+# -------- Stateless principal --------
+
+@dataclass(frozen=True)
+class Principal:
+    """Who a token belongs to, taken from its claims (no ORM row)."""
+    id: int
+    email: str
+    token_version: int = 0
+    expires_at: float = 0.0
+
+
+_principal_cache: TTLCache[Principal] = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+
+# Resolving a `uid` token (see deps.get_current_user):
+#   1. cached_principal: hit -> done, no JWT verify and no DB work
+#   2. principal_from_token: verify the JWT, then the caller reads the user's
+#      users.token_version (one primary-key lookup), refuses the token if the
+#      user is gone or its `tv` claim is older, and remember_principal caches
+#      the result for AUTH_CACHE_TTL
+# Revoking a user's tokens (deps.revoke_tokens_stmt) bumps users.token_version,
+# so it holds across workers and restarts and is at most AUTH_CACHE_TTL stale.
+
+def cached_principal(token: str) -> Optional[Principal]:
+    """A principal verified against the users table within AUTH_CACHE_TTL, or None."""
+    return _principal_cache.get(token)
+
+
+def principal_from_token(token: str) -> Optional[Principal]:
+    """
+    Decode a token carrying a `uid` claim. Neither the user's existence nor
+    its token_version is checked here. Returns None for invalid or expired
+    tokens and for older tokens that only have `sub`; callers fall back to a
+    users lookup by email for those.
+    """
+    payload = decode_token(token)
+    if not payload or "uid" not in payload or "sub" not in payload:
+        return None
+
+    return Principal(
+        id=int(payload["uid"]), email=payload["sub"],
+        token_version=int(payload.get("tv", 0)), expires_at=float(payload["exp"]),
+    )
+
+
+def remember_principal(token: str, principal: Principal) -> None:
+    """Cache a principal whose users row was just checked."""
+    # never cache past the token's own expiry
+    _principal_cache.set(token, principal, ttl=principal.expires_at - time.time())
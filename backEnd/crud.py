@@ -0,0 +1,318 @@
+# backEnd/crud.py
+# SQL shared by the sync (main.py) and async (async_routes.py) todo routes,
+# so both modes run exactly the same statements.
+from dataclasses import dataclass
+from typing import Optional, Sequence, Dict, Any, List, Tuple, Iterator, AsyncIterator
+from sqlalchemy import select, insert, update, delete, Select, Row, Executable, Result
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.concurrency import run_in_threadpool
+from .database import DB_MODE, SessionLocal, AsyncSessionLocal
+from .models import Todo as TodoModel, User
+from .schemas import TodoBatchOp
+from .fast_json import PageEncoder, todo_items
+from .deps import user_not_found
+
+TODOS_PAGE_DEFAULT = 100
+TODOS_PAGE_MAX = 500
+# limits above TODOS_PAGE_MAX (up to TODOS_STREAM_MAX) are streamed as chunked
+# JSON, TODOS_STREAM_CHUNK rows at a time, so memory stays flat
+TODOS_STREAM_MAX = 100_000
+TODOS_STREAM_CHUNK = 1000
+TODOS_DELTA_MAX = 1000  # more changes than this since a client's version: it should refetch
+# tombstones older than TOMBSTONE_KEEP versions are purged, at most once every
+# TOMBSTONE_PURGE_EVERY versions; clients that far behind get full_resync
+TOMBSTONE_KEEP = 1000
+TOMBSTONE_PURGE_EVERY = 100
+
+def todos_page_stmt(user_id: int, limit: int, after: Optional[int], done: Optional[bool]) -> Select:
+    # Plain column select (no ORM objects), keyset on (user_id, id) so every
+    # page is an index range scan no matter how deep the client has paged.
+    stmt = (
+        select(TodoModel.id, TodoModel.title, TodoModel.done)
+        .where(TodoModel.user_id == user_id, TodoModel.deleted.is_(False))
+        .order_by(TodoModel.id)
+        .limit(limit + 1)  # one extra row tells us whether there is a next page
+    )
+    if after is not None:
+        stmt = stmt.where(TodoModel.id > after)
+    if done is not None:
+        stmt = stmt.where(TodoModel.done == done)
+    return stmt
+
+
+def todos_page(rows: Sequence[Row], limit: int, version: Optional[int] = None) -> Dict[str, Any]:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": todo_items(rows),
+        "next_cursor": rows[-1].id if has_more else None,
+        "version": version,
+    }
+
+
+# The streamers open their own session: the request's session is closed once
+# the handler returns, before the body is sent.
+
+def stream_todos_page(stmt: Select, limit: int, version: int) -> Iterator[bytes]:
+    enc = PageEncoder(limit, version)
+    yield enc.start()
+    with SessionLocal() as db:
+        for rows in db.execute(stmt.execution_options(yield_per=TODOS_STREAM_CHUNK)).partitions():
+            chunk = enc.feed(rows)
+            if chunk:
+                yield chunk
+            if enc.has_more:
+                break
+    yield enc.end()
+
+
+async def stream_todos_page_async(stmt: Select, limit: int, version: int) -> AsyncIterator[bytes]:
+    enc = PageEncoder(limit, version)
+    yield enc.start()
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=TODOS_STREAM_CHUNK))
+        async for rows in result.partitions():
+            chunk = enc.feed(rows)
+            if chunk:
+                yield chunk
+            if enc.has_more:
+                break
+    yield enc.end()
+
+
+def owned_todo_stmt(todo_id: int, user_id: int) -> Select:
+    return select(TodoModel).where(
+        TodoModel.id == todo_id, TodoModel.user_id == user_id, TodoModel.deleted.is_(False)
+    )
+
+
+# -------- Versioning (ETag / ?since=) --------
+# Every mutation bumps users.todo_version inside its own transaction and
+# stamps the rows it touched with the new value. The UPDATE row-locks the
+# user, so concurrent writers for one user commit in version order and a
+# reader that has seen version N has seen every change <= N.
+
+def bump_version_stmt(user_id: int):
+    return (
+        update(User).where(User.id == user_id)
+        .values(todo_version=User.todo_version + 1)
+        .returning(User.todo_version)
+    )
+
+
+def user_version_stmt(user_id: int) -> Select:
+    return select(User.todo_version).where(User.id == user_id)
+
+
+def version_or_401(result: Result) -> int:
+    # A cached principal can outlive its users row (AUTH_CACHE_TTL), so the
+    # version statements may find nothing; answer like get_current_user would.
+    version = result.scalar_one_or_none()
+    if version is None:
+        raise user_not_found()
+    return version
+
+
+def etag_for(user_id: int, version: int) -> str:
+    return f'W/"{user_id}.{version}"'
+
+
+def list_headers(etag: str) -> Dict[str, str]:
+    # private: per-user data; no-cache: browsers must revalidate (cheap 304)
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def todos_delta_stmt(user_id: int, since: int) -> Select:
+    return (
+        select(TodoModel.id, TodoModel.title, TodoModel.done, TodoModel.deleted)
+        .where(TodoModel.user_id == user_id, TodoModel.version > since)
+        .order_by(TodoModel.id)
+        .limit(TODOS_DELTA_MAX + 1)
+    )
+
+
+def tombstone_floor_stmt(user_id: int) -> Select:
+    return select(User.tombstone_floor).where(User.id == user_id)
+
+
+def todos_delta(rows: Sequence[Row], version: int, resync: bool = False) -> Dict[str, Any]:
+    if resync or len(rows) > TODOS_DELTA_MAX:
+        return {"version": version, "changed": [], "deleted": [], "full_resync": True}
+    return {
+        "version": version,
+        "changed": todo_items(r for r in rows if not r.deleted),
+        "deleted": [r.id for r in rows if r.deleted],
+        "full_resync": False,
+    }
+
+
+# Purging moves the floor up and hard-deletes the tombstones under it. Call it
+# after a delete, in the same transaction: the version bump already holds the
+# user's row lock, so purges for one user never race.
+
+def _raise_floor_stmt(user_id: int, version: int):
+    floor = version - TOMBSTONE_KEEP
+    return (
+        update(User)
+        .where(User.id == user_id, User.tombstone_floor <= floor - TOMBSTONE_PURGE_EVERY)
+        .values(tombstone_floor=floor)
+        .returning(User.tombstone_floor)
+    )
+
+
+def _purge_stmt(user_id: int, floor: int):
+    return delete(TodoModel).where(
+        TodoModel.user_id == user_id, TodoModel.deleted.is_(True), TodoModel.version <= floor
+    )
+
+
+def purge_tombstones(db: Session, user_id: int, version: int) -> None:
+    floor = db.execute(_raise_floor_stmt(user_id, version)).scalar_one_or_none()
+    if floor is not None:
+        db.execute(_purge_stmt(user_id, floor))
+
+
+async def purge_tombstones_async(db: AsyncSession, user_id: int, version: int) -> None:
+    floor = (await db.execute(_raise_floor_stmt(user_id, version))).scalar_one_or_none()
+    if floor is not None:
+        await db.execute(_purge_stmt(user_id, floor))
+
+
+def todo_dict(todo: TodoModel) -> Dict[str, Any]:
+    return {"id": todo.id, "title": todo.title, "done": todo.done}
+
+
+# -------- Batch (/todos/batch) --------
+# A batch becomes at most: one multi-row INSERT ... RETURNING, one
+# UPDATE ... WHERE id IN (...) RETURNING per distinct set of new values, and
+# one tombstoning UPDATE ... WHERE id IN (...) RETURNING for deletes.
+# Ownership is part of every WHERE clause, so ids that are missing or belong
+# to someone else simply do not come back and are reported as not found.
+
+@dataclass
+class BatchStep:
+    kind: str                       # "create" | "update" | "delete"
+    indexes: List[int]              # positions in the request's ops list
+    stmt: Executable
+    params: Optional[List[Dict[str, Any]]] = None  # executemany params (creates)
+
+
+_RETURN_COLS = (TodoModel.id, TodoModel.title, TodoModel.done)
+_UNSET = object()
+
+
+def plan_batch(user_id: int, ops: Sequence[TodoBatchOp], version: int) -> List[BatchStep]:
+    steps: List[BatchStep] = []
+
+    creates = [i for i, o in enumerate(ops) if o.op == "create"]
+    if creates:
+        steps.append(BatchStep(
+            kind="create",
+            indexes=creates,
+            # sort_by_parameter_order: RETURNING rows line up with `params`
+            stmt=insert(TodoModel).returning(*_RETURN_COLS, sort_by_parameter_order=True),
+            params=[{"title": ops[i].title, "done": bool(ops[i].done), "user_id": user_id, "version": version}
+                    for i in creates],
+        ))
+
+    # group updates that set the same values so they share one statement
+    # (e.g. "mark these 200 done" is a single UPDATE)
+    groups: Dict[Tuple[Any, Any], List[int]] = {}
+    for i, o in enumerate(ops):
+        if o.op == "update":
+            key = (_UNSET if o.title is None else o.title, _UNSET if o.done is None else o.done)
+            groups.setdefault(key, []).append(i)
+    for (title, done), idxs in groups.items():
+        values = {}
+        if title is not _UNSET:
+            values["title"] = title
+        if done is not _UNSET:
+            values["done"] = done
+        where = (
+            TodoModel.user_id == user_id,
+            TodoModel.id.in_([ops[i].id for i in idxs]),
+            TodoModel.deleted.is_(False),
+        )
+        stmt = (update(TodoModel).where(*where).values(**values, version=version).returning(*_RETURN_COLS)
+                if values else select(*_RETURN_COLS).where(*where))  # empty patch: just confirm it exists
+        steps.append(BatchStep(kind="update", indexes=idxs, stmt=stmt))
+
+    deletes = [i for i, o in enumerate(ops) if o.op == "delete"]
+    if deletes:
+        steps.append(BatchStep(
+            kind="delete",
+            indexes=deletes,
+            stmt=update(TodoModel)
+            .where(
+                TodoModel.user_id == user_id,
+                TodoModel.id.in_([ops[i].id for i in deletes]),
+                TodoModel.deleted.is_(False),
+            )
+            .values(deleted=True, title="", version=version)
+            .returning(TodoModel.id),
+        ))
+    return steps
+
+
+def batch_results(ops: Sequence[TodoBatchOp], executed: List[Tuple[BatchStep, Sequence[Row]]]) -> Dict[str, Any]:
+    results: List[Optional[Dict[str, Any]]] = [None] * len(ops)
+    for step, rows in executed:
+        if step.kind == "create":
+            for i, r in zip(step.indexes, rows):
+                results[i] = {"op": "create", "ok": True, "id": r.id,
+                              "todo": {"id": r.id, "title": r.title, "done": r.done}}
+            continue
+        by_id = {r.id: r for r in rows}
+        for i in step.indexes:
+            todo_id = ops[i].id
+            r = by_id.get(todo_id)
+            if r is None:
+                results[i] = {"op": step.kind, "ok": False, "id": todo_id, "error": "Todo not found"}
+            elif step.kind == "update":
+                results[i] = {"op": "update", "ok": True, "id": todo_id,
+                              "todo": {"id": r.id, "title": r.title, "done": r.done}}
+            else:
+                results[i] = {"op": "delete", "ok": True, "id": todo_id}
+    return {"results": results}
+
+
+def run_batch(db: Session, user_id: int, ops: Sequence[TodoBatchOp]) -> Dict[str, Any]:
+    """Apply ops in one transaction; per-op "not found" is reported, not raised."""
+    version = version_or_401(db.execute(bump_version_stmt(user_id)))
+    executed = [(step, db.execute(step.stmt, step.params).all()) for step in plan_batch(user_id, ops, version)]
+    if any(step.kind == "delete" for step, _ in executed):
+        purge_tombstones(db, user_id, version)
+    db.commit()
+    return batch_results(ops, executed)
+
+
+async def run_batch_async(db: AsyncSession, user_id: int, ops: Sequence[TodoBatchOp]) -> Dict[str, Any]:
+    version = version_or_401(await db.execute(bump_version_stmt(user_id)))
+    executed = []
+    for step in plan_batch(user_id, ops, version):
+        executed.append((step, (await db.execute(step.stmt, step.params)).all()))
+    if any(step.kind == "delete" for step, _ in executed):
+        await purge_tombstones_async(db, user_id, version)
+    await db.commit()
+    return batch_results(ops, executed)
+
+
+async def apply_batch(user_id: int, ops: Sequence[TodoBatchOp]) -> Dict[str, Any]:
+    """run_batch for async callers outside the todo routes, in either DB_MODE."""
+    if DB_MODE == "async":
+        async with AsyncSessionLocal() as db:
+            return await run_batch_async(db, user_id, ops)
+
+    def work() -> Dict[str, Any]:
+        with SessionLocal() as db:
+            return run_batch(db, user_id, ops)
+
+    return await run_in_threadpool(work)
@@ -1,5 +1,11 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -8,7 +14,151 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set")
 
-engine = create_engine(DATABASE_URL)
+# "sync" = classic def routes on the threadpool, "async" = async def routes on
+# AsyncSession. Both share the same schema; flip it to A/B throughput.
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+if DB_MODE not in ("sync", "async"):
+    raise ValueError(f"DB_MODE must be 'sync' or 'async', got {DB_MODE!r}")
+
+# async drivers for the URLs we actually deploy with (DO Postgres, local SQLite)
+ASYNC_DRIVERS = {"postgresql": "psycopg", "sqlite": "aiosqlite"}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its async counterpart."""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r}")
+    return u.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    return int(raw) if raw not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    return raw.strip().lower() in ("1", "true", "yes", "on") if raw not in (None, "") else default
+
+
+# Pool sizing. Defaults match SQLAlchemy's except pre-ping/recycle, which we
+# want on for managed Postgres (it drops idle connections behind our back).
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)          # seconds to wait for a free connection
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)        # seconds; -1 disables
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+DB_STATEMENT_TIMEOUT_MS = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)  # Postgres only; 0 = server default
+# create missing tables at app startup (see migrate.py; concurrent workers
+# serialize on a Postgres advisory lock). The multi-worker launcher migrates
+# once up front and turns this off for its workers.
+DB_AUTO_MIGRATE = _env_bool("DB_AUTO_MIGRATE", True)
+
+
+class PoolMetrics:
+    """Counters for connection checkout, read by GET /metrics/pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_seconds_total": round(self.wait_seconds_total, 6),
+                "checkout_wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedCheckout:
+    # SQLAlchemy has no "waited for a connection" event, so time the queue
+    # get itself. _do_get is where QueuePool blocks when the pool is exhausted.
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.observe_wait(time.perf_counter() - t0, timed_out=True)
+            raise
+        pool_metrics.observe_wait(time.perf_counter() - t0)
+        return conn
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine/create_async_engine kwargs built from the DB_POOL_* env."""
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite" and u.database in (None, "", ":memory:"):
+        return {}  # in-memory SQLite is a single shared connection; no pool to tune
+
+    opts: Dict[str, Any] = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if u.get_backend_name() == "postgresql" and DB_STATEMENT_TIMEOUT_MS > 0:
+        opts["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return opts
+
+
+def pool_status() -> Dict[str, Any]:
+    """Live pool gauges plus the checkout counters, for whichever engine serves requests."""
+    pool = (async_engine.sync_engine if async_engine is not None else engine).pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # QueuePool.overflow() starts at -size and counts up; clamp to "extra connections in use"
+            "overflow_in_use": max(pool.overflow(), 0),
+            "max_overflow": DB_MAX_OVERFLOW,
+        })
+    stats.update(pool_metrics.snapshot())
+    return stats
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_MODE == "async":
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+    # expire_on_commit=False: attribute access after commit must not trigger
+    # an implicit (sync) reload inside an async handler.
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
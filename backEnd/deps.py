@@ -1,10 +1,14 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from .database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import SessionLocal, AsyncSessionLocal, DB_MODE
 from . import models
-from .auth_utils import decode_token 
+from .auth_utils import decode_token, cached_principal, principal_from_token, remember_principal, Principal
 from .models import User
+from .metrics import timed
 # This tells FastAPI:
 # "Tokens will be sent using OAuth2 Bearer in the header,
 # and users can get them from /auth/login"
@@ -20,26 +24,117 @@ def get_db():
         db.close()        # close after request finishes
 
 
-# Get the current logged-in user (from the token)
+def _legacy_email(token: str) -> str:
+    # Tokens minted before the `uid` claim only carry the email in `sub`.
+    # They predate `tv` too, so any revocation (token_version > 0) ends them.
+    payload = decode_token(token)
+    if not payload or "sub" not in payload or "uid" in payload:
+        raise _invalid_token()
+    return payload["sub"]
+
+
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired token"
+    )
+
+
+def _token_version_stmt(user_id: int):
+    return select(User.token_version).where(User.id == user_id)
+
+
+def revoke_tokens_stmt(user_id: int):
+    """
+    Run in the same transaction as a password change or account deletion:
+    every token issued before it is refused, in every worker, once cached
+    principals expire (AUTH_CACHE_TTL).
+    """
+    return update(User).where(User.id == user_id).values(token_version=User.token_version + 1)
+
+
+def _check_token_version(principal: Principal, current: Optional[int]) -> None:
+    if current is None:
+        raise user_not_found()
+    if principal.token_version < current:
+        raise _invalid_token()
+
+
+def user_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User not found"
+    )
+
+
+# Get the current logged-in user (from the token).
+# Fast path: a cached principal, so no users query at all. On a cache miss a
+# `uid` token costs one primary-key lookup to make sure the user still exists
+# and has not revoked the token since (users.token_version).
+# The session is only opened lazily, so the fast path never checks out a connection.
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
-) -> User:
-    payload = decode_token(token)  # will verify JWT and return data
-    if not payload or "sub" not in payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
-        )
+) -> Principal:
+    principal = cached_principal(token)
+    if principal is not None:
+        return principal
+
+    principal = principal_from_token(token)
+    if principal is not None:
+        with timed("user_lookup"):
+            current = db.execute(_token_version_stmt(principal.id)).scalar_one_or_none()
+        _check_token_version(principal, current)
+        remember_principal(token, principal)
+        return principal
+
+    email = _legacy_email(token)
+    with timed("user_lookup"):
+        user = db.query(User).filter(User.email == email).first()
+
+    if not user:
+        raise user_not_found()
+    if user.token_version > 0:
+        raise _invalid_token()
+
+    return Principal(id=user.id, email=user.email)
+
+
+# ---- async twins (used when DB_MODE=async) ----
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:  # closed when the request finishes
+        yield db
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    principal = cached_principal(token)
+    if principal is not None:
+        return principal
 
-    email = payload["sub"]  # sub = subject = email in our case
-    user = db.query(User).filter(User.email == email).first()
+    principal = principal_from_token(token)
+    if principal is not None:
+        with timed("user_lookup"):
+            current = (await db.execute(_token_version_stmt(principal.id))).scalar_one_or_none()
+        _check_token_version(principal, current)
+        remember_principal(token, principal)
+        return principal
+
+    email = _legacy_email(token)
+    with timed("user_lookup"):
+        user = (await db.execute(select(User).where(User.email == email))).scalars().first()
 
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+        raise user_not_found()
+    if user.token_version > 0:
+        raise _invalid_token()
+
+    return Principal(id=user.id, email=user.email)
+
 
-    return user
-    
\ No newline at end of file
+# For routes mounted in both modes (e.g. the AI routes): the variant that
+# matches DB_MODE, so async mode never falls back to a sync session.
+current_user = get_current_user_async if DB_MODE == "async" else get_current_user
@@ -0,0 +1,72 @@
+# backEnd/fast_json.py
+# JSON for the todo list routes, written straight from row tuples. The
+# default path builds a dict per row, validates it against response_model
+# and runs it through jsonable_encoder before json.dumps; here rows become
+# bytes in one pass. The shapes match schemas.Todo / TodoPage / TodoDelta /
+# TodoSearchPage field for field, and the routes keep their response_model
+# so the OpenAPI contract is unchanged.
+#
+# orjson is optional: without it the stdlib encoder produces the same bytes,
+# just slower.
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def todo_items(rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """(id, title, done) tuples -> Todo dicts; bool() because raw SQLite rows give 0/1."""
+    return [{"id": id_, "title": title, "done": bool(done)} for id_, title, done, *_ in rows]
+
+
+class FastJSONResponse(JSONResponse):
+    """Return one of these from a route to skip response_model validation."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class PageEncoder:
+    """
+    A TodoPage streamed as chunked JSON: `{"items":[` first, then one chunk
+    per batch of rows, then the closing `],"next_cursor":..,"version":..}`.
+    Feed it the rows of a `limit + 1` query (todos_page_stmt); it stops at
+    `limit` and uses the extra row only to set next_cursor.
+    """
+
+    def __init__(self, limit: int, version: Optional[int]) -> None:
+        self.limit = limit
+        self.version = version
+        self.count = 0
+        self.last_id: Optional[int] = None
+        self.has_more = False
+
+    def start(self) -> bytes:
+        return b'{"items":['
+
+    def feed(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        room = self.limit - self.count
+        if len(rows) > room:
+            rows, self.has_more = rows[:room], True
+        if not rows:
+            return b""
+        body = dumps(todo_items(rows))[1:-1]  # drop the list's own brackets
+        sep = b"," if self.count else b""
+        self.count += len(rows)
+        self.last_id = rows[-1][0]
+        return sep + body
+
+    def end(self) -> bytes:
+        next_cursor = self.last_id if self.has_more else None
+        return b'],"next_cursor":' + dumps(next_cursor) + b',"version":' + dumps(self.version) + b"}"
@@ -0,0 +1,103 @@
+# backEnd/hashing.py
+# bcrypt off the request path: hashes run in a small process pool with a hard
+# cap on queued work, so a login burst gets fast 429s instead of starving
+# every other route. Kept free of FastAPI/DB imports; worker processes import
+# only this module.
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 0 workers = hash inline in the calling thread (the old behaviour)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+# running + queued hashes allowed before we start refusing
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(max(HASH_WORKERS, 1) * 8)))
+
+# min == max == BCRYPT_ROUNDS: any stored hash at another cost reports
+# needs_update, so changing the env var migrates users as they log in.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+class HashPoolBusy(Exception):
+    """Raised when HASH_QUEUE_LIMIT hashes are already running or waiting."""
+
+
+# module-level so they pickle into the worker processes
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    # one bcrypt to verify, plus one more only if the stored cost is stale
+    return pwd_context.verify_and_update(plain, hashed)
+
+
+class HashPool:
+    def __init__(self, workers: int, queue_limit: int) -> None:
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # created on first use so importing the app never forks
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),  # no forking a threaded server
+                )
+            return self._executor
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise HashPoolBusy()
+        try:
+            if self.workers <= 0:
+                fut: Future = Future()
+                try:
+                    fut.set_result(fn(*args))
+                except BaseException as e:
+                    fut.set_exception(e)
+            else:
+                fut = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _: self._slots.release())
+        return fut
+
+    # blocking variants, for the sync (threadpool) routes
+    def hash(self, password: str) -> str:
+        return self._submit(_hash, password).result()
+
+    def verify_and_update(self, plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        return self._submit(_verify_and_update, plain, hashed).result()
+
+    # awaitable variants, for the async routes
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_hash, password))
+
+    async def verify_and_update_async(self, plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self._submit(_verify_and_update, plain, hashed))
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hash_pool = HashPool(workers=HASH_WORKERS, queue_limit=HASH_QUEUE_LIMIT)
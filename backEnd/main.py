@@ -1,84 +1,199 @@
 # backEnd/main.py
-from typing import List
-import os
-import uvicorn
+import time
 
-from fastapi import FastAPI, Depends, HTTPException, status, Response
+_IMPORT_STARTED = time.perf_counter()
+
+import contextlib
+import logging
+from typing import Optional, Union
+
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, Response, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.orm import Session
 
-from .database import engine, Base
-from . import models
+from .database import engine, async_engine, DB_MODE, DB_AUTO_MIGRATE, pool_status
 from .models import Todo as TodoModel
-from .schemas import Todo as TodoSchema, TodoCreate, TodoUpdate
+from .schemas import (
+    Todo as TodoSchema, TodoCreate, TodoUpdate, TodoPage, TodoDelta, TodoSearchPage, TodoBatch, TodoBatchResponse,
+)
+from .search import search_terms, search_stmt, search_page, SEARCH_PAGE_DEFAULT, SEARCH_PAGE_MAX, SEARCH_MAX_OFFSET
 from .auth import router as auth_router
 from .deps import get_db, get_current_user
-from backEnd.schemas import User  # your Pydantic UserOut/User type
-
-from .ai_routes import router as ai_router
-
-app = FastAPI()
-
-app.include_router(ai_router)
-
-
+from .crud import (
+    todos_page_stmt, todos_page, stream_todos_page, run_batch, TODOS_PAGE_DEFAULT, TODOS_PAGE_MAX, TODOS_STREAM_MAX,
+    bump_version_stmt, user_version_stmt, version_or_401, etag_for, etag_matches, list_headers, todos_delta_stmt, todos_delta,
+    tombstone_floor_stmt, purge_tombstones,
+)
+from . import async_routes, migrate
+from .auth_utils import Principal
+from .fast_json import FastJSONResponse
+from .hashing import hash_pool, HashPoolBusy
+from .ai_cache import ai_cache
+from .ai_limits import gate_snapshot
+from .ai_routes import router as ai_router, close_client as close_ai_client
+from .metrics import MetricsMiddleware, Gauge, registry, render as render_metrics
 
 ALLOWED_ORIGINS = [
     "https://starfish-app-ms4wl.ondigitalocean.app",  # <-- your React site
     "http://localhost:5173",
     "http://127.0.0.1:5173",
 ]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],   # POST/GET/PATCH/DELETE/OPTIONS
-    allow_headers=["*"],   # let browser send content-type, authorization, etc.
-    max_age=86400,
-)
 
-app.include_router(ai_router)
+STARTUP_SECONDS = registry.register(Gauge(
+    "app_startup_seconds", "Worker cold start: module import and lifespan startup"))
+
+# Prometheus scrape target. The JSON /metrics/* views below stay for humans;
+# their numeric fields are re-exported here as gauges.
+registry.gauges_from("db_pool", "DB connection pool state (see /metrics/pool)", pool_status)
+registry.gauges_from("ai_cache", "AI response cache state (see /metrics/ai-cache)", ai_cache.snapshot)
+registry.gauges_from("ai_gate", "AI concurrency gate state (see /metrics/ai-gate)", gate_snapshot)
+
+
+# -------- Lifecycle --------
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    t0 = time.perf_counter()
+    if DB_AUTO_MIGRATE:
+        await run_in_threadpool(migrate.upgrade)
+    startup = time.perf_counter() - t0
+    STARTUP_SECONDS.inc(startup, phase="lifespan")
+    # uvicorn's logger: it is the one configured inside worker processes
+    logging.getLogger("uvicorn.error").info(
+        "worker ready: import %.2fs, startup %.2fs (db_mode=%s, migrate=%s)",
+        _IMPORT_SECONDS, startup, DB_MODE, DB_AUTO_MIGRATE)
+    yield
+    hash_pool.shutdown()
+    await close_ai_client()
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
 
 
-@app.options("/{path:path}")
+# -------- Health, metrics, CORS preflight --------
+
+ops_router = APIRouter()
+
+@ops_router.options("/{path:path}", include_in_schema=False)
 def cors_preflight(path: str):
     return Response(status_code=204)
 
-models.Base.metadata.create_all(bind=engine)
-app.include_router(auth_router)
-
-@app.get("/health")
+@ops_router.get("/health")
 def health():
-    return {"ok": True}
+    return {"ok": True, "db_mode": DB_MODE}
+
+@ops_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@ops_router.get("/metrics/pool")
+def metrics_pool():
+    return pool_status()
+
+@ops_router.get("/metrics/ai-cache")
+def metrics_ai_cache():
+    return ai_cache.snapshot()
+
+@ops_router.get("/metrics/ai-gate")
+def metrics_ai_gate():
+    return gate_snapshot()
+
+# Pool exhausted for DB_POOL_TIMEOUT seconds: tell the client to back off
+# instead of surfacing a generic 500.
+async def pool_timeout_handler(request: Request, exc: sa_exc.TimeoutError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+# Too many bcrypt jobs queued (login burst / credential stuffing): shed load fast.
+async def hash_pool_busy_handler(request: Request, exc: HashPoolBusy):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many sign-in attempts in progress, please retry"},
+        headers={"Retry-After": "1"},
+    )
 
 # -------- Todos API --------
-@app.get("/todos", response_model=List[TodoSchema])
+# Sync handlers; the async twins live in async_routes.py and are mounted
+# instead when DB_MODE=async (see create_app).
+todos_router = APIRouter(tags=["todos"])
+
+@todos_router.get("/todos", response_model=Union[TodoPage, TodoDelta])
 def get_todos(
+    request: Request,
+    limit: int = Query(TODOS_PAGE_DEFAULT, ge=1, le=TODOS_STREAM_MAX,
+                       description=f"pages above {TODOS_PAGE_MAX} are streamed"),
+    after: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    done: Optional[bool] = None,
+    since: Optional[int] = Query(None, ge=0, description="version from an earlier response; returns only changes"),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    # one PK lookup decides whether anything changed at all
+    version = version_or_401(db.execute(user_version_stmt(user.id)))
+    etag = etag_for(user.id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=list_headers(etag))
+    headers = list_headers(etag)
+
+    if since is not None:
+        # tombstones below the floor are gone, so an older client can't be caught up
+        floor = version_or_401(db.execute(tombstone_floor_stmt(user.id)))
+        rows = db.execute(todos_delta_stmt(user.id, since)).all() if since >= floor else []
+        return FastJSONResponse(todos_delta(rows, version, resync=since < floor), headers=headers)
+    stmt = todos_page_stmt(user.id, limit, after, done)
+    if limit > TODOS_PAGE_MAX:
+        return StreamingResponse(stream_todos_page(stmt, limit, version),
+                                 media_type="application/json", headers=headers)
+    return FastJSONResponse(todos_page(db.execute(stmt).all(), limit, version), headers=headers)
+
+@todos_router.get("/todos/search", response_model=TodoSearchPage)
+def search_todos(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(SEARCH_PAGE_DEFAULT, ge=1, le=SEARCH_PAGE_MAX),
+    offset: int = Query(0, ge=0, le=SEARCH_MAX_OFFSET),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    rows = db.query(TodoModel).filter(TodoModel.user_id == user.id).all()
-    return [{"id": t.id, "title": t.title, "done": t.done} for t in rows]
+    terms = search_terms(q)
+    if not terms:
+        return {"items": [], "next_offset": None}
+    rows = db.execute(search_stmt(user.id, terms, limit, offset)).all()
+    return FastJSONResponse(search_page(rows, limit, offset))
 
-@app.post("/todos", response_model=TodoSchema, status_code=status.HTTP_201_CREATED)
+@todos_router.post("/todos", response_model=TodoSchema, status_code=status.HTTP_201_CREATED)
 def add_todo(
     todo: TodoCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    new_todo = TodoModel(title=todo.title, done=todo.done, user_id=user.id)
+    version = version_or_401(db.execute(bump_version_stmt(user.id)))
+    new_todo = TodoModel(title=todo.title, done=todo.done, user_id=user.id, version=version)
     db.add(new_todo); db.commit(); db.refresh(new_todo)
     return {"id": new_todo.id, "title": new_todo.title, "done": new_todo.done}
 
-@app.patch("/todos/{todo_id}", response_model=TodoSchema)
+@todos_router.post("/todos/batch", response_model=TodoBatchResponse)
+def batch_todos(
+    body: TodoBatch,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    return run_batch(db, user.id, body.ops)
+
+@todos_router.patch("/todos/{todo_id}", response_model=TodoSchema)
 def update_todo(
     todo_id: int,
     body: TodoUpdate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     todo = db.query(TodoModel).filter(
-        TodoModel.id == todo_id, TodoModel.user_id == user.id
+        TodoModel.id == todo_id, TodoModel.user_id == user.id, TodoModel.deleted.is_(False)
     ).first()
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
@@ -86,23 +201,63 @@ def update_todo(
         todo.title = body.title
     if body.done is not None:
         todo.done = body.done
+    todo.version = version_or_401(db.execute(bump_version_stmt(user.id)))
     db.commit(); db.refresh(todo)
     return {"id": todo.id, "title": todo.title, "done": todo.done}
 
-@app.delete("/todos/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
+@todos_router.delete("/todos/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_todo(
     todo_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     todo = db.query(TodoModel).filter(
-        TodoModel.id == todo_id, TodoModel.user_id == user.id
+        TodoModel.id == todo_id, TodoModel.user_id == user.id, TodoModel.deleted.is_(False)
     ).first()
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
-    db.delete(todo); db.commit()
+    # tombstone, so ?since= clients learn about the delete
+    todo.deleted, todo.title = True, ""
+    todo.version = version_or_401(db.execute(bump_version_stmt(user.id)))
+    purge_tombstones(db, user.id, todo.version)
+    db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-# For local runs only; DO uses its own run command.
-if __name__ == "__main__":
-    uvicorn.run("backEnd.main:app", host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
+# -------- App factory --------
+
+def create_app() -> FastAPI:
+    """
+    Build the ASGI app. Cheap and free of I/O: the schema is created in the
+    lifespan (or once by `python -m backEnd.migrate`), the OpenAI client on
+    the first AI request.
+    """
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],   # POST/GET/PATCH/DELETE/OPTIONS
+        allow_headers=["*"],   # let browser send content-type, authorization, etc.
+        max_age=86400,
+    )
+    # outermost, so latency includes CORS and error handling
+    app.add_middleware(MetricsMiddleware)
+    app.add_exception_handler(sa_exc.TimeoutError, pool_timeout_handler)
+    app.add_exception_handler(HashPoolBusy, hash_pool_busy_handler)
+
+    app.include_router(ops_router)
+    app.include_router(ai_router)
+    if DB_MODE == "async":
+        app.include_router(async_routes.auth_router)
+        app.include_router(async_routes.todos_router)
+    else:
+        app.include_router(auth_router)
+        app.include_router(todos_router)
+    return app
+
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+STARTUP_SECONDS.inc(_IMPORT_SECONDS, phase="import")
+
+# `uvicorn backEnd.main:app`; production runs go through `python -m backEnd.serve`.
+app = create_app()
@@ -0,0 +1,274 @@
+# backEnd/metrics.py
+# In-process request metrics, rendered in the Prometheus text format by
+# GET /metrics. No prometheus_client dependency; every worker process keeps
+# its own numbers, so scrape each one or aggregate in Prometheus.
+#
+# Three sources feed it:
+#   * MetricsMiddleware: per-route latency histogram, status counters, in-flight gauge
+#   * SQLAlchemy cursor events: query count/time, attributed to the current request
+#   * timed("name"): explicit spans around JWT decode, bcrypt, LLM calls, ...
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+
+# log any request slower than this, with its SQL and span breakdown; 0 disables
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_MAX_STATEMENTS = int(os.getenv("SLOW_REQUEST_MAX_STATEMENTS", "10"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**kw: str) -> Labels:
+    return tuple(sorted(kw.items()))
+
+
+def _fmt_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_float(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str) -> None:
+        self.name, self.help, self.type = name, help, "counter"
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_fmt_labels(k)} {_fmt_float(v)}" for k, v in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    def __init__(self, name: str, help: str) -> None:
+        super().__init__(name, help)
+        self.type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.name, self.help, self.type = name, help, "histogram"
+        self.buckets = tuple(buckets) + (float("inf"),)
+        # labels -> [per-bucket counts (not cumulative), sum, count]
+        self._values: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, n) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, c in zip(self.buckets, counts):
+                    cumulative += c
+                    le = 'le="%s"' % _fmt_float(bound)
+                    lines.append(f"{self.name}_bucket{_fmt_labels(key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_fmt_labels(key)} {_fmt_float(total)}")
+                lines.append(f"{self.name}_count{_fmt_labels(key)} {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list = []
+        # callables returning {name: value} read at scrape time (pool, AI gate, cache)
+        self._collectors: List[Tuple[str, str, Callable[[], Dict[str, object]]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def gauges_from(self, prefix: str, help: str, snapshot: Callable[[], Dict[str, object]]) -> None:
+        """Expose the numeric fields of an existing /metrics/* snapshot as gauges."""
+        self._collectors.append((prefix, help, snapshot))
+
+    def render(self) -> str:
+        out: List[str] = []
+        for m in self._metrics:
+            out += [f"# HELP {m.name} {m.help}", f"# TYPE {m.name} {m.type}", *m.render()]
+        for prefix, help, snapshot in self._collectors:
+            for k, v in snapshot().items():
+                if isinstance(v, bool) or not isinstance(v, (int, float)):
+                    continue
+                name = f"{prefix}_{k}"
+                out += [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {_fmt_float(v)}"]
+        return "\n".join(out) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route, until the last body byte is sent"))
+REQUESTS = registry.register(Counter("http_requests_total", "Requests by route and status code"))
+IN_FLIGHT = registry.register(Gauge("http_requests_in_flight", "Requests currently being served"))
+REQUEST_QUERIES = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per request", QUERY_COUNT_BUCKETS))
+REQUEST_DB_SECONDS = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request"))
+DB_QUERY_SECONDS = registry.register(Histogram(
+    "db_query_duration_seconds", "Single SQL statement latency, by statement verb"))
+SPAN_SECONDS = registry.register(Histogram(
+    "app_span_duration_seconds", "Explicitly timed operations (jwt_decode, password_verify, llm_call, ...)"))
+
+
+# -------- per-request context --------
+
+@dataclass
+class RequestStats:
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_seconds: float = 0.0
+    # (seconds, statement) for the slowest statements, only kept when slow logging is on
+    statements: List[Tuple[float, str]] = field(default_factory=list)
+    spans: Dict[str, float] = field(default_factory=dict)
+
+
+# The object is mutated in place, so threadpool handlers (which run in a
+# copy of the context) still report into the request that spawned them.
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+
+@contextlib.contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Time a block into app_span_duration_seconds{span=name} and the current request."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        SPAN_SECONDS.observe(elapsed, span=name)
+        stats = _current.get()
+        if stats is not None:
+            stats.spans[name] = stats.spans.get(name, 0.0) + elapsed
+
+
+# -------- SQL hooks --------
+# Registered on the Engine class, so they cover the sync engine and the sync
+# core of the async engine alike.
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    verb = statement.split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    DB_QUERY_SECONDS.observe(elapsed, verb=verb)
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.db_seconds += elapsed
+    if SLOW_REQUEST_MS > 0:
+        stats.statements.append((elapsed, " ".join(statement.split())[:300]))
+        if len(stats.statements) > SLOW_REQUEST_MAX_STATEMENTS * 4:
+            stats.statements.sort(reverse=True)
+            del stats.statements[SLOW_REQUEST_MAX_STATEMENTS:]
+
+
+# -------- middleware --------
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (not BaseHTTPMiddleware, which would buffer
+    streaming responses). Latency runs to the end of the response body, so
+    SSE routes report their full stream time. Routes are labelled by their
+    template ("/todos/{todo_id}"), unmatched paths collapse to one label.
+    """
+
+    def __init__(self, app, skip_paths: Tuple[str, ...] = ("/metrics",)) -> None:
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            _current.reset(token)
+            self._record(scope, stats, status_code)
+
+    def _record(self, scope, stats: RequestStats, status_code: int) -> None:
+        elapsed = time.perf_counter() - stats.started
+        route = scope.get("route")
+        path = getattr(route, "path", None) or "unmatched"
+        method = scope["method"]
+        REQUEST_SECONDS.observe(elapsed, method=method, route=path)
+        REQUESTS.inc(method=method, route=path, status=str(status_code))
+        REQUEST_QUERIES.observe(stats.queries, method=method, route=path)
+        REQUEST_DB_SECONDS.observe(stats.db_seconds, method=method, route=path)
+
+        if SLOW_REQUEST_MS > 0 and elapsed * 1000 >= SLOW_REQUEST_MS:
+            top = sorted(stats.statements, reverse=True)[:SLOW_REQUEST_MAX_STATEMENTS]
+            log.warning(
+                "slow request %s %s -> %d in %.1fms: sql=%d queries/%.1fms spans={%s}%s",
+                method, path, status_code, elapsed * 1000, stats.queries, stats.db_seconds * 1000,
+                ", ".join(f"{k}: {v * 1000:.1f}ms" for k, v in stats.spans.items()),
+                "".join(f"\n    {s * 1000:8.1f}ms  {sql}" for s, sql in top),
+            )
+
+
+def render() -> str:
+    return registry.render()
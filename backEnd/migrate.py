@@ -0,0 +1,81 @@
+# backEnd/migrate.py
+# Schema setup, run once per deploy rather than on every import of the app:
+#
+#     python -m backEnd.migrate
+#
+# Brings any database up to the current models, whether empty or created by
+# an older release:
+#   * create_all: missing tables (with their indexes)
+#   * ADDED_COLUMNS: columns added to a table after it first shipped
+#   * indexes declared on the models but missing from existing tables
+#   * the full-text index (search.create_search_index)
+# Every step checks what is there first, so re-running it is a no-op.
+#
+# Safe to run from several processes at once (e.g. `uvicorn --workers N` with
+# DB_AUTO_MIGRATE on): on Postgres a transaction-scoped advisory lock makes
+# them take turns, and everyone after the first finds nothing to create.
+import logging
+import time
+
+from sqlalchemy import Column, inspect, text
+
+from .database import engine, Base
+from . import models  # also registers the tables on Base.metadata
+from . import search
+
+log = logging.getLogger(__name__)
+
+# Each needs a server_default (or to be nullable) so existing rows get a value.
+ADDED_COLUMNS = (
+    models.Todo.__table__.c.version,
+    models.Todo.__table__.c.deleted,
+    models.User.__table__.c.todo_version,
+    models.User.__table__.c.tombstone_floor,
+    models.User.__table__.c.token_version,
+)
+
+# any constant works; it only has to be the same in every process
+MIGRATE_LOCK_KEY = 0x746F646F
+
+
+def upgrade(bind=engine) -> float:
+    """Create whatever is missing; returns the seconds it took."""
+    t0 = time.perf_counter()
+    with bind.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # released at commit, after the DDL it guards
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATE_LOCK_KEY})
+        Base.metadata.create_all(bind=conn)
+        _add_missing_columns(conn)
+        _create_missing_indexes(conn)
+        search.create_search_index(conn)
+    return time.perf_counter() - t0
+
+
+def _add_missing_columns(conn) -> None:
+    insp = inspect(conn)
+    existing = {}
+    for column in ADDED_COLUMNS:
+        table = column.table.name
+        if table not in existing:
+            existing[table] = {c["name"] for c in insp.get_columns(table)}
+        if column.name not in existing[table]:
+            log.info("adding column %s.%s", table, column.name)
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {_column_spec(conn, column)}"))
+
+
+def _create_missing_indexes(conn) -> None:
+    # after _add_missing_columns: e.g. ix_todos_user_id_version needs todos.version
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _column_spec(conn, column: Column) -> str:
+    # the same "name TYPE DEFAULT ... NOT NULL" that CREATE TABLE would use
+    return conn.dialect.ddl_compiler(conn.dialect, None).get_column_specification(column)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    log.info("schema up to date (%.2fs, %s)", upgrade(), engine.url.get_backend_name())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index, false
 from .database import Base
 
 
@@ -10,6 +10,19 @@ class Todo(Base):
     title = Column(String, nullable=False)
     done = Column(Boolean, default=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Delta sync: `version` is the owner's User.todo_version at this row's last
+    # change, and deletes only set `deleted` (a tombstone) so they can be reported.
+    # Tombstones keep no title and are purged below User.tombstone_floor.
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    deleted = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    # Keyset pagination walks (user_id, id), so this index serves both the
+    # per-user filter and the ORDER BY id without a sort step.
+    # (user_id, version) serves the ?since= delta query the same way.
+    __table_args__ = (
+        Index("ix_todos_user_id_id", "user_id", "id"),
+        Index("ix_todos_user_id_version", "user_id", "version"),
+    )
 
 
 class User(Base):
@@ -18,5 +31,11 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+    # bumped by every todo mutation; the ETag and ?since= cursor of GET /todos
+    todo_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # tombstones with version <= this have been purged; ?since= below it must resync
+    tombstone_floor = Column(Integer, nullable=False, default=0, server_default="0")
+    # the `tv` claim of new tokens; bumping it revokes every older token
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
 
@@ -1,7 +1,7 @@
 # like repository in dotnet 
 
-from typing import Optional
-from pydantic import BaseModel, EmailStr, ConfigDict
+from typing import List, Literal, Optional
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, model_validator
 
 class User(BaseModel):
     id: int
@@ -43,4 +43,59 @@ class Todo(BaseModel):
     id: int
     title: str
     done: bool
-    model_config = ConfigDict(from_attributes=True)  
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class TodoPage(BaseModel):
+    items: List[Todo]
+    next_cursor: Optional[int] = None  # pass back as ?after= to get the next page
+    version: Optional[int] = None      # pass back as ?since= to get only later changes
+
+class TodoSearchPage(BaseModel):
+    items: List[Todo]                  # best match first
+    next_offset: Optional[int] = None  # pass back as ?offset= for more results
+
+class TodoDelta(BaseModel):
+    version: int
+    changed: List[Todo]                # created or updated since the given version
+    deleted: List[int]
+    full_resync: bool = False          # too much changed, or too long ago; fetch the list again instead
+
+
+# -------- Batch --------
+
+TODO_BATCH_MAX = 1000
+
+class TodoBatchOp(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = None       # update/delete
+    title: Optional[str] = None    # create (required) / update
+    done: Optional[bool] = None    # create (defaults to False) / update
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.op == "create" and self.title is None:
+            raise ValueError("create needs a title")
+        if self.op in ("update", "delete") and self.id is None:
+            raise ValueError(f"{self.op} needs an id")
+        return self
+
+class TodoBatch(BaseModel):
+    ops: List[TodoBatchOp] = Field(min_length=1, max_length=TODO_BATCH_MAX)
+
+    @model_validator(mode="after")
+    def check_unique_ids(self):
+        # one update/delete per id keeps the result independent of op order
+        ids = [o.id for o in self.ops if o.op != "create"]
+        if len(ids) != len(set(ids)):
+            raise ValueError("each todo id may appear in at most one update/delete op")
+        return self
+
+class TodoBatchResult(BaseModel):
+    op: Literal["create", "update", "delete"]
+    ok: bool
+    id: Optional[int] = None
+    todo: Optional[Todo] = None    # final state for create/update
+    error: Optional[str] = None
+
+class TodoBatchResponse(BaseModel):
+    results: List[TodoBatchResult]
@@ -0,0 +1,101 @@
+# backEnd/search.py
+# Full-text search over todo titles. Postgres uses a GIN index on
+# to_tsvector('simple', title); SQLite (local/test runs) an FTS5 table kept
+# in sync by triggers. Both are created by migrate.upgrade (see
+# create_search_index at the bottom); anything else falls back to a LIKE scan.
+import re
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import Connection, Row, func, inspect, literal_column, select, text
+from sqlalchemy.sql import Executable
+
+from .database import engine
+from .models import Todo as TodoModel
+from .fast_json import todo_items
+
+SEARCH_PAGE_DEFAULT = 20
+SEARCH_PAGE_MAX = 100
+SEARCH_MAX_OFFSET = 1000   # ranked results; deep paging is not useful
+SEARCH_MAX_TERMS = 8
+
+DIALECT = engine.dialect.name  # the async engine always points at the same database
+
+
+def search_terms(q: str) -> List[str]:
+    # word characters only: nothing from the user reaches the query syntax
+    return re.findall(r"\w+", q.lower())[:SEARCH_MAX_TERMS]
+
+
+def search_stmt(user_id: int, terms: List[str], limit: int, offset: int) -> Executable:
+    """Best match first; every term must match, the last one as a prefix (search-as-you-type)."""
+    if DIALECT == "postgresql":
+        tsquery = " & ".join(terms[:-1] + [terms[-1] + ":*"])
+        # literal config, not a bind param: must match the index expression exactly
+        vector = func.to_tsvector(literal_column("'simple'"), TodoModel.title)
+        query = func.to_tsquery(literal_column("'simple'"), tsquery)
+        return (
+            select(TodoModel.id, TodoModel.title, TodoModel.done)
+            .where(TodoModel.user_id == user_id, TodoModel.deleted.is_(False), vector.op("@@")(query))
+            .order_by(func.ts_rank(vector, query).desc(), TodoModel.id)
+            .limit(limit + 1).offset(offset)
+        )
+
+    if DIALECT == "sqlite":
+        match = " ".join(f'"{t}"' for t in terms[:-1]) + f' "{terms[-1]}"*'
+        return text(
+            "SELECT t.id, t.title, t.done FROM todos_fts "
+            "JOIN todos t ON t.id = todos_fts.rowid "
+            "WHERE todos_fts MATCH :match AND t.user_id = :user_id AND NOT t.deleted "
+            "ORDER BY bm25(todos_fts), t.id LIMIT :limit OFFSET :offset"
+        ).bindparams(match=match.strip(), user_id=user_id, limit=limit + 1, offset=offset)
+
+    stmt = select(TodoModel.id, TodoModel.title, TodoModel.done).where(
+        TodoModel.user_id == user_id, TodoModel.deleted.is_(False)
+    )
+    for t in terms:
+        stmt = stmt.where(TodoModel.title.ilike(f"%{t}%"))
+    return stmt.order_by(TodoModel.id).limit(limit + 1).offset(offset)
+
+
+def search_page(rows: Sequence[Row], limit: int, offset: int) -> Dict[str, Any]:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": todo_items(rows),
+        "next_offset": offset + limit if has_more and offset + limit <= SEARCH_MAX_OFFSET else None,
+    }
+
+
+# -------- Index DDL --------
+# Run by migrate.upgrade on every deploy, after the todos table exists; every
+# statement is IF NOT EXISTS, so a database that predates search gets it too.
+
+_POSTGRES_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_todos_title_fts ON todos USING gin (to_tsvector('simple', title))",
+)
+
+# external-content FTS5 table: stores only the index, reads titles from todos
+_SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(title, content='todos', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_ai AFTER INSERT ON todos BEGIN "
+    "INSERT INTO todos_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_ad AFTER DELETE ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_au AFTER UPDATE OF title ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO todos_fts(rowid, title) VALUES (new.id, new.title); END",
+)
+
+
+def create_search_index(conn: Connection) -> None:
+    """Create the full-text index for conn's dialect if it is missing."""
+    if conn.dialect.name == "postgresql":
+        for ddl in _POSTGRES_DDL:
+            conn.execute(text(ddl))
+    elif conn.dialect.name == "sqlite":
+        fresh = not inspect(conn).has_table("todos_fts")
+        for ddl in _SQLITE_DDL:
+            conn.execute(text(ddl))
+        if fresh:
+            # index the titles written before the triggers existed
+            conn.execute(text("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')"))
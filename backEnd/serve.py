@@ -0,0 +1,84 @@
+# backEnd/serve.py
+# Production launcher: migrate once, then run WEB_CONCURRENCY uvicorn worker
+# processes under uvicorn's supervisor (it restarts workers that die).
+#
+#     python -m backEnd.serve
+#
+# Configured from the environment:
+#   HOST, PORT               bind address (0.0.0.0:8080)
+#   WEB_CONCURRENCY          worker processes (default: usable CPUs, at most 4)
+#   UVICORN_LOOP             auto | uvloop | asyncio   (auto: uvloop if installed)
+#   UVICORN_HTTP             auto | httptools | h11    (auto: httptools if installed)
+#   UVICORN_KEEPALIVE        keep-alive seconds (5)
+#   UVICORN_BACKLOG          listen backlog (2048)
+#   FORWARDED_ALLOW_IPS      trusted proxy IPs for X-Forwarded-* ("*" behind DO's LB)
+#   LOG_LEVEL                info
+#
+# Every worker has its own DB pool, bcrypt pool (HASH_WORKERS processes),
+# AI gate and caches, so size DB_POOL_SIZE / HASH_WORKERS / AI_MAX_CONCURRENCY
+# per worker. The launcher logs the worst-case Postgres connection count;
+# keep it under the database's connection limit.
+import importlib.util
+import logging
+import os
+import time
+
+import uvicorn
+
+log = logging.getLogger("backEnd.serve")
+
+# os.cpu_count() is the host's core count even inside a container with a CPU
+# limit, and every worker multiplies the DB and bcrypt pools
+WEB_CONCURRENCY_DEFAULT_MAX = 4
+
+
+def _default_workers() -> int:
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    return max(1, min(cpus, WEB_CONCURRENCY_DEFAULT_MAX))
+
+
+def _pick(env_name: str, preferred: str, fallback: str) -> str:
+    choice = os.getenv(env_name, "auto").lower()
+    if choice != "auto":
+        return choice
+    return preferred if importlib.util.find_spec(preferred) is not None else fallback
+
+
+def main() -> None:
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "info").upper(), format="%(levelname)s %(name)s: %(message)s")
+    t0 = time.perf_counter()
+
+    # once, here, instead of in every worker's startup
+    from . import migrate
+    log.info("schema up to date (%.2fs)", migrate.upgrade())
+    os.environ["DB_AUTO_MIGRATE"] = "0"  # inherited by the spawned workers
+
+    from .database import DB_POOL_SIZE, DB_MAX_OVERFLOW
+    from .hashing import HASH_WORKERS
+
+    workers = int(os.getenv("WEB_CONCURRENCY") or _default_workers())
+    loop = _pick("UVICORN_LOOP", "uvloop", "asyncio")
+    http = _pick("UVICORN_HTTP", "httptools", "h11")
+    log.info("starting %d worker(s), loop=%s http=%s (launcher ready in %.2fs)",
+             workers, loop, http, time.perf_counter() - t0)
+    log.info("worst case: %d DB connections (%d worker(s) x (pool %d + overflow %d)), %d bcrypt processes",
+             workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW), workers, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+             workers * HASH_WORKERS)
+
+    uvicorn.run(
+        "backEnd.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8080")),
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=int(os.getenv("UVICORN_KEEPALIVE", "5")),
+        backlog=int(os.getenv("UVICORN_BACKLOG", "2048")),
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        proxy_headers=True,
+        log_level=os.getenv("LOG_LEVEL", "info").lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/_common.py
+# Small helpers shared by the benchmark scripts: start the API under uvicorn,
+# sign up a user, drive concurrent load and summarise latencies.
+import asyncio
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))  # so scripts can import backEnd helpers directly
+PASSWORD = "Benchmark1"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def sqlite_url(name: str) -> str:
+    """A fresh SQLite file under /tmp, used when no DATABASE_URL is given."""
+    path = Path("/tmp") / f"todo-bench-{name}.db"
+    if path.exists():
+        path.unlink()
+    return f"sqlite:///{path}"
+
+
+@contextlib.contextmanager
+def _process(cmd: List[str], env: Dict[str, str], base: str, what: str) -> Iterator[str]:
+    """Start `cmd`, wait until `base`/health answers, yield `base`, then stop it."""
+    proc = subprocess.Popen(cmd, cwd=REPO_ROOT, env={**os.environ, **env})
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{base}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"{what} did not come up")
+            time.sleep(0.1)
+        yield base
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+@contextlib.contextmanager
+def serve(env: Dict[str, str], port: Optional[int] = None, app: str = "backEnd.main:app") -> Iterator[str]:
+    """Run the API in a uvicorn subprocess and yield its base URL."""
+    port = port or free_port()
+    env = {"OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "bench"), **env}
+    cmd = [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"]
+    with _process(cmd, env, f"http://127.0.0.1:{port}", "API") as base:
+        yield base
+
+
+@contextlib.contextmanager
+def serve_fake_openai(*extra_args: str) -> Iterator[str]:
+    """Run benchmarks/fake_openai.py and yield the OPENAI_BASE_URL to point the API at."""
+    port = free_port()
+    cmd = [sys.executable, str(Path(__file__).with_name("fake_openai.py")), "--port", str(port), *extra_args]
+    with _process(cmd, {}, f"http://127.0.0.1:{port}", "fake OpenAI") as base:
+        yield f"{base}/v1"
+
+
+def signup_and_login(base: str, email: str) -> Dict[str, str]:
+    """Create a user and return the Authorization header for it."""
+    httpx.post(f"{base}/auth/signup", json={"email": email, "password": PASSWORD}, timeout=30)
+    r = httpx.post(f"{base}/auth/login", json={"email": email, "password": PASSWORD}, timeout=30)
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def percentile(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summarize(
+    name: str, latencies: List[float], elapsed: float, errors: int = 0, codes: Optional[Counter] = None
+) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "codes": {str(k): v for k, v in sorted((codes or Counter()).items())},
+    }
+
+
+async def drive(
+    name: str,
+    request: Callable[[httpx.AsyncClient], Awaitable[Optional[httpx.Response]]],
+    base: str,
+    concurrency: int,
+    duration: float,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> Dict[str, Any]:
+    """
+    Run `request` from `concurrency` workers for `duration` seconds. A
+    request that returns None ends its worker early (e.g. nothing left to
+    delete). Pass an httpx.ASGITransport to drive the app in-process.
+    """
+    latencies: List[float] = []
+    errors = 0
+    codes: Counter = Counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60, transport=transport) as client:
+        stop_at = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                t0 = time.perf_counter()
+                try:
+                    r = await request(client)
+                    if r is None:
+                        return
+                    ok = r.status_code < 400
+                    codes[r.status_code] += 1
+                except httpx.HTTPError:
+                    ok = False
+                    codes["transport"] += 1
+                if ok:
+                    latencies.append(time.perf_counter() - t0)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(name, latencies, elapsed, errors, codes)
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    cols = ["requests", "errors", "rps", "p50_ms", "p99_ms"]
+    width = max([12] + [len(str(r.get("name", ""))) for r in results])
+    print(f"{'name':<{width}}  " + "  ".join(f"{c:>12}" for c in cols) + "  codes")
+    for r in results:
+        print(f"{str(r.get('name', '')):<{width}}  " + "  ".join(f"{str(r.get(c, '')):>12}" for c in cols) + f"  {r.get('codes', '')}")
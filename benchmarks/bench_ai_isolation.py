@@ -0,0 +1,84 @@
+# benchmarks/bench_ai_isolation.py
+"""
+Harness for the upstream guard rails (ai_limits.py) against a slow or flaky
+fake OpenAI server.
+
+    python benchmarks/bench_ai_isolation.py --ttft 5 --ai-concurrency 64
+    python benchmarks/bench_ai_isolation.py --ttft 0.1 --fail-rate 0.3 --fail-status 429
+
+Floods /ai/chat (cache bypassed) while a few clients read GET /todos, and
+reports both: AI status codes show the gate shedding load (503) or retries
+absorbing injected failures, the /todos p99 shows whether CRUD latency held.
+"""
+import argparse
+import asyncio
+import json
+import os
+
+import httpx
+
+from _common import serve, serve_fake_openai, signup_and_login, drive, print_table, sqlite_url
+
+
+async def run(args) -> list:
+    fake_args = ["--ttft", str(args.ttft), "--fail-rate", str(args.fail_rate), "--fail-status", str(args.fail_status)]
+    with serve_fake_openai(*fake_args) as openai_url:
+        env = {
+            "DB_MODE": args.mode,
+            "DATABASE_URL": os.environ.get("DATABASE_URL") or sqlite_url("ai-isolation"),
+            "OPENAI_BASE_URL": openai_url,
+            "OPENAI_API_KEY": "fake",
+            "AI_MAX_CONCURRENCY": str(args.gate),
+            "AI_MAX_QUEUE": str(args.queue),
+            "AI_TIMEOUT": str(args.timeout),
+            "AI_BACKOFF_BASE": "0.05",
+        }
+        with serve(env) as base:
+            headers = signup_and_login(base, "bench-ai@example.com")
+
+            async def ask(client):
+                return await client.post(
+                    "/ai/chat",
+                    json={"messages": [{"role": "user", "content": "hello"}]},
+                    headers={"X-Cache-Bypass": "1"},
+                )
+
+            async def read(client):
+                return await client.get("/todos", params={"limit": 20}, headers=headers)
+
+            baseline = await drive("todos alone", read, base, args.read_concurrency, args.duration)
+            ai, loaded = await asyncio.gather(
+                drive("ai flood", ask, base, args.ai_concurrency, args.duration),
+                drive("todos under ai", read, base, args.read_concurrency, args.duration),
+            )
+            gate = httpx.get(f"{base}/metrics/ai-gate").json()
+            fake = httpx.get(openai_url.rsplit("/v1", 1)[0] + "/stats").json()
+    return [baseline, ai, loaded, {"name": "ai gate", **gate}, {"name": "fake upstream", **fake}]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--ttft", type=float, default=3.0, help="fake upstream latency (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--fail-status", type=int, default=500)
+    parser.add_argument("--gate", type=int, default=8, help="AI_MAX_CONCURRENCY")
+    parser.add_argument("--queue", type=int, default=8, help="AI_MAX_QUEUE")
+    parser.add_argument("--timeout", type=float, default=30, help="AI_TIMEOUT")
+    parser.add_argument("--ai-concurrency", type=int, default=48)
+    parser.add_argument("--read-concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=8.0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results[:3])
+        for extra in results[3:]:
+            print(extra)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_ai_stream.py
+"""
+Time-to-first-token and total time for POST /ai/chat/stream vs POST /ai/chat,
+against the local fake OpenAI server (no API key or network needed).
+
+    python benchmarks/bench_ai_stream.py --ttft 0.3 --token-delay 0.02 --requests 20
+"""
+import argparse
+import json
+import os
+import time
+
+import httpx
+
+from _common import serve, serve_fake_openai, percentile, sqlite_url
+
+MESSAGES = [{"role": "user", "content": "Suggest 3 productive tasks for me today."}]
+
+
+def stream_once(c: httpx.Client) -> tuple:
+    t0 = time.perf_counter()
+    first = None
+    with c.stream("POST", "/ai/chat/stream", json={"messages": MESSAGES}) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if line.startswith("data:") and first is None:
+                first = time.perf_counter() - t0
+            if line == "data: [DONE]":
+                break
+    return first, time.perf_counter() - t0
+
+
+def plain_once(c: httpx.Client) -> float:
+    t0 = time.perf_counter()
+    c.post("/ai/chat", json={"messages": MESSAGES}).raise_for_status()
+    return time.perf_counter() - t0
+
+
+def summary(name: str, samples: list) -> dict:
+    return {"name": name, "n": len(samples),
+            "p50_ms": round(percentile(samples, 50) * 1000, 1), "p99_ms": round(percentile(samples, 99) * 1000, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ttft", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    fake_args = ["--ttft", str(args.ttft), "--token-delay", str(args.token_delay), "--tokens", str(args.tokens)]
+    with serve_fake_openai(*fake_args) as openai_url:
+        env = {"OPENAI_BASE_URL": openai_url, "OPENAI_API_KEY": "fake",
+               "DATABASE_URL": os.environ.get("DATABASE_URL") or sqlite_url("ai-stream")}
+        with serve(env) as base, httpx.Client(base_url=base, timeout=120) as c:
+            streamed = [stream_once(c) for _ in range(args.requests)]
+            plain = [plain_once(c) for _ in range(args.requests)]
+
+    results = [
+        summary("stream first token", [s[0] for s in streamed]),
+        summary("stream complete", [s[1] for s in streamed]),
+        summary("non-stream complete", plain),
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(f"{r['name']:>20}  n={r['n']:<4} p50={r['p50_ms']:>8}ms  p99={r['p99_ms']:>8}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_auth.py
+"""
+Per-request auth cost: a legacy `sub`-only token (decode + users lookup on
+every call) against a `uid` token served from the principal cache.
+
+    python benchmarks/bench_auth.py --concurrency 16 --duration 10
+
+Both token kinds hit GET /todos?limit=1 on the same server, so the only
+difference is the auth dependency.
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from _common import serve, signup_and_login, drive, print_table, sqlite_url
+from backEnd.auth_utils import create_access_token
+
+EMAIL = "bench-auth@example.com"
+
+
+async def run(args) -> list:
+    env = {
+        "DB_MODE": args.mode,
+        "DATABASE_URL": os.environ.get("DATABASE_URL") or sqlite_url("auth"),
+        "AUTH_CACHE_SIZE": str(args.cache_size),
+    }
+    with serve(env) as base:
+        fast = signup_and_login(base, EMAIL)
+        legacy = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+
+        def reader(headers):
+            async def read(client):
+                return await client.get("/todos", params={"limit": 1}, headers=headers)
+            return read
+
+        return [
+            await drive("legacy token", reader(legacy), base, args.concurrency, args.duration),
+            await drive("uid token", reader(fast), base, args.concurrency, args.duration),
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--cache-size", type=int, default=10000, help="AUTH_CACHE_SIZE; 0 = decode every request")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
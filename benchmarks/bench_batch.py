@@ -0,0 +1,83 @@
+# benchmarks/bench_batch.py
+"""
+Create/update/delete N todos one request at a time vs one /todos/batch call.
+
+    python benchmarks/bench_batch.py --n 500
+
+Reports wall time and ops/s for each path; requests are sequential, as a
+client importing or clearing a list would send them.
+"""
+import argparse
+import json
+import os
+import time
+
+import httpx
+
+from _common import serve, signup_and_login, sqlite_url
+
+
+def timed(name: str, n: int, fn) -> dict:
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    return {"name": name, "ops": n, "seconds": round(elapsed, 4), "ops_per_s": round(n / elapsed, 1)}
+
+
+def run(args) -> list:
+    env = {"DB_MODE": args.mode, "DATABASE_URL": os.environ.get("DATABASE_URL") or sqlite_url("batch")}
+    results = []
+    with serve(env) as base:
+        headers = signup_and_login(base, "bench-batch@example.com")
+        with httpx.Client(base_url=base, headers=headers, timeout=120) as c:
+            ids: list = []
+
+            def create_each():
+                for i in range(args.n):
+                    ids.append(c.post("/todos", json={"title": f"item {i}"}).json()["id"])
+
+            def update_each():
+                for todo_id in ids:
+                    c.patch(f"/todos/{todo_id}", json={"done": True})
+
+            def delete_each():
+                for todo_id in ids:
+                    c.delete(f"/todos/{todo_id}")
+
+            results.append(timed("per-item create", args.n, create_each))
+            results.append(timed("per-item update", args.n, update_each))
+            results.append(timed("per-item delete", args.n, delete_each))
+
+            def batch(ops):
+                r = c.post("/todos/batch", json={"ops": ops})
+                r.raise_for_status()
+                return r.json()["results"]
+
+            created: list = []
+            results.append(timed("batch create", args.n, lambda: created.extend(
+                batch([{"op": "create", "title": f"item {i}"} for i in range(args.n)]))))
+            batch_ids = [r["id"] for r in created]
+            results.append(timed("batch update", args.n, lambda: batch(
+                [{"op": "update", "id": i, "done": True} for i in batch_ids])))
+            results.append(timed("batch delete", args.n, lambda: batch(
+                [{"op": "delete", "id": i} for i in batch_ids])))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--n", type=int, default=500, help="todos per run (max 1000 per batch)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(f"{r['name']:>18}  {r['ops']:>6} ops  {r['seconds']:>8}s  {r['ops_per_s']:>10} ops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_db_modes.py
+"""
+A/B the sync (threadpool) and async (AsyncSession) request paths.
+
+    python benchmarks/bench_db_modes.py --concurrency 64 --duration 10
+
+Uses DATABASE_URL if set (e.g. a local Postgres), otherwise a throwaway
+SQLite file per mode. Each mode runs in its own uvicorn process.
+"""
+import argparse
+import asyncio
+import json
+import os
+
+import httpx
+
+from _common import serve, signup_and_login, drive, print_table, sqlite_url
+
+
+def seed(base: str, headers, n: int) -> None:
+    with httpx.Client(base_url=base, headers=headers, timeout=30) as c:
+        for i in range(n):
+            c.post("/todos", json={"title": f"seed {i}", "done": i % 3 == 0})
+
+
+async def run_mode(mode: str, args) -> list:
+    env = {"DB_MODE": mode, "DATABASE_URL": os.environ.get("DATABASE_URL") or sqlite_url(mode)}
+    with serve(env) as base:
+        headers = signup_and_login(base, f"bench-{mode}@example.com")
+        seed(base, headers, args.todos)
+
+        async def read(client):
+            return await client.get("/todos", params={"limit": 50}, headers=headers)
+
+        async def write(client):
+            return await client.post("/todos", json={"title": "bench"}, headers=headers)
+
+        return [
+            await drive(f"{mode} GET", read, base, args.concurrency, args.duration),
+            await drive(f"{mode} POST", write, base, args.concurrency, args.duration),
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--todos", type=int, default=200, help="todos seeded per user")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    results = []
+    for mode in ("sync", "async"):
+        results += asyncio.run(run_mode(mode, args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/bench_json.py
+"""
+Encoding cost of a GET /todos page, without HTTP or a database in the way:
+FastAPI's default path (response_model validation + jsonable_encoder +
+json.dumps) against backEnd/fast_json.py, plus peak memory for a huge page
+built in one piece vs streamed in chunks.
+
+    python benchmarks/bench_json.py --rows 500 --big 100000
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from collections import namedtuple
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+import _common  # noqa: F401  (puts the repo root on sys.path)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from backEnd.crud import todos_page, TODOS_STREAM_CHUNK
+from backEnd.fast_json import FastJSONResponse, PageEncoder
+from backEnd.schemas import TodoPage
+
+
+Row = namedtuple("Row", "id title done")  # stands in for sqlalchemy Row
+
+
+def make_rows(n: int) -> list:
+    return [Row(i, f"todo number {i} with a realistic title", i % 3 == 0) for i in range(1, n + 2)]
+
+
+def per_call_us(fn, seconds: float = 1.0) -> float:
+    n, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        fn()
+        n += 1
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def peak_kib(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="rows in a normal page")
+    parser.add_argument("--big", type=int, default=100_000, help="rows in the streamed page")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    adapter = TypeAdapter(TodoPage)
+
+    def default_path() -> bytes:
+        # what FastAPI does for `return todos_page(...)` with response_model=TodoPage
+        model = adapter.validate_python(todos_page(rows, args.rows, 1))
+        return JSONResponse(jsonable_encoder(model)).body
+
+    def fast_path() -> bytes:
+        return FastJSONResponse(todos_page(rows, args.rows, 1)).body
+
+    assert json.loads(default_path()) == json.loads(fast_path())
+
+    big = make_rows(args.big)
+
+    def whole() -> None:
+        FastJSONResponse(todos_page(big, args.big, 1))
+
+    def streamed() -> None:
+        enc = PageEncoder(args.big, 1)
+        for i in range(0, len(big), TODOS_STREAM_CHUNK):
+            enc.feed(big[i:i + TODOS_STREAM_CHUNK])
+        enc.end()
+
+    results = [
+        {"name": f"default encode ({args.rows} rows)", "us_per_page": round(per_call_us(default_path), 1)},
+        {"name": f"fast encode ({args.rows} rows)", "us_per_page": round(per_call_us(fast_path), 1)},
+        {"name": f"one-piece body ({args.big} rows)", "peak_kib": round(peak_kib(whole), 1)},
+        {"name": f"streamed body ({args.big} rows)", "peak_kib": round(peak_kib(streamed), 1)},
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(f"{r['name']:>34}  " + "  ".join(f"{k}={v}" for k, v in r.items() if k != "name"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_login.py
+"""
+Login throughput and GET /todos latency while logins hammer the server.
+
+    python benchmarks/bench_login.py --login-concurrency 32 --duration 10
+
+Runs once with bcrypt inline (HASH_WORKERS=0) and once with the process
+pool, so the effect of moving hashing off the request path shows up in the
+todo-read p99. 429s from the hash queue limit are counted as errors.
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from _common import serve, signup_and_login, drive, print_table, sqlite_url, PASSWORD
+
+EMAIL = "bench-login@example.com"
+
+
+async def run(label: str, env_extra: dict, args) -> list:
+    env = {
+        "DB_MODE": args.mode,
+        "DATABASE_URL": os.environ.get("DATABASE_URL") or sqlite_url(f"login-{label}"),
+        "BCRYPT_ROUNDS": str(args.rounds),
+        **env_extra,
+    }
+    with serve(env) as base:
+        headers = signup_and_login(base, EMAIL)
+
+        async def login(client):
+            return await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+
+        async def read(client):
+            return await client.get("/todos", params={"limit": 20}, headers=headers)
+
+        return list(await asyncio.gather(
+            drive(f"{label} login", login, base, args.login_concurrency, args.duration),
+            drive(f"{label} GET", read, base, args.read_concurrency, args.duration),
+        ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS")
+    parser.add_argument("--workers", type=int, default=2, help="HASH_WORKERS for the pooled run")
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--read-concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = []
+    results += asyncio.run(run("inline", {"HASH_WORKERS": "0", "HASH_QUEUE_LIMIT": "1000"}, args))
+    results += asyncio.run(run("pool", {"HASH_WORKERS": str(args.workers)}, args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
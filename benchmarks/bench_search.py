@@ -0,0 +1,91 @@
+# benchmarks/bench_search.py
+"""
+GET /todos/search against the old way of searching: page through the whole
+GET /todos list and filter on the client.
+
+    python benchmarks/bench_search.py --rows 100000 --queries 20
+
+Seeds --rows todos for one user through /todos/batch, then times both
+approaches for the same queries. Uses DATABASE_URL if set (Postgres: GIN
+tsvector index), otherwise SQLite with the FTS5 table.
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+import httpx
+
+from _common import serve, signup_and_login, percentile, sqlite_url
+
+WORDS = ("buy call email fix plan book clean pay write read review send order "
+         "milk bread car rent report slides invoice dentist flight garden").split()
+
+
+def seed(c: httpx.Client, rows: int) -> None:
+    rng = random.Random(42)
+    for start in range(0, rows, 1000):
+        n = min(1000, rows - start)
+        ops = [{"op": "create", "title": " ".join(rng.sample(WORDS, 3)) + f" {start + i}"} for i in range(n)]
+        c.post("/todos/batch", json={"ops": ops}).raise_for_status()
+
+
+def fetch_all_and_filter(c: httpx.Client, q: str) -> int:
+    terms = q.lower().split()
+    hits, after = 0, None
+    while True:
+        params = {"limit": 500, **({"after": after} if after is not None else {})}
+        page = c.get("/todos", params=params).json()
+        hits += sum(all(t in item["title"].lower() for t in terms) for item in page["items"])
+        after = page["next_cursor"]
+        if after is None:
+            return hits
+
+
+def timed(fn, queries) -> list:
+    samples = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--fetch-all-queries", type=int, default=3, help="the slow path; keep it small")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    queries = [" ".join(rng.sample(WORDS, rng.choice((1, 2)))) for _ in range(args.queries)]
+
+    env = {"DB_MODE": args.mode, "DATABASE_URL": os.environ.get("DATABASE_URL") or sqlite_url("search")}
+    with serve(env) as base:
+        headers = signup_and_login(base, "bench-search@example.com")
+        with httpx.Client(base_url=base, headers=headers, timeout=600) as c:
+            t0 = time.perf_counter()
+            seed(c, args.rows)
+            seed_s = time.perf_counter() - t0
+            search = timed(lambda q: c.get("/todos/search", params={"q": q, "limit": 20}).raise_for_status(), queries)
+            fetch_all = timed(lambda q: fetch_all_and_filter(c, q), queries[: args.fetch_all_queries])
+
+    results = []
+    for name, samples in (("search endpoint", search), ("fetch-all + filter", fetch_all)):
+        results.append({"name": name, "rows": args.rows, "n": len(samples),
+                        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                        "p99_ms": round(percentile(samples, 99) * 1000, 2)})
+    if args.json:
+        print(json.dumps({"seed_seconds": round(seed_s, 2), "results": results}, indent=2))
+    else:
+        print(f"seeded {args.rows} rows in {seed_s:.1f}s")
+        for r in results:
+            print(f"{r['name']:>20}  n={r['n']:<4} p50={r['p50_ms']:>10}ms  p99={r['p99_ms']:>10}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_startup.py
+"""
+Cold start: wall time from spawning the server to the first 200 from
+/health, plus the app's own import/startup split from GET /metrics.
+
+    python benchmarks/bench_startup.py --runs 5 --workers 1,4
+
+Measures plain `uvicorn backEnd.main:app` (schema created in the lifespan)
+and the `python -m backEnd.serve` launcher (migrate once, N workers).
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import httpx
+
+from _common import _process, free_port, percentile, sqlite_url
+
+
+def startup_gauges(base: str) -> dict:
+    text = httpx.get(f"{base}/metrics", timeout=5).text
+    return {phase: float(v) for phase, v in re.findall(r'app_startup_seconds\{phase="(\w+)"\} (\S+)', text)}
+
+
+def cold_start(cmd_for_port, env: dict) -> tuple:
+    port = free_port()
+    env = {**env, "PORT": str(port)}  # the launcher reads PORT; plain uvicorn gets --port
+    t0 = time.perf_counter()
+    with _process(cmd_for_port(port), env, f"http://127.0.0.1:{port}", "API") as base:
+        elapsed = time.perf_counter() - t0
+        return elapsed, startup_gauges(base)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", default="1,2", help="WEB_CONCURRENCY values for the launcher")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    variants = [("uvicorn backEnd.main:app", lambda port: [
+        sys.executable, "-m", "uvicorn", "backEnd.main:app", "--port", str(port), "--log-level", "warning"], {})]
+    for n in (int(w) for w in args.workers.split(",") if w):
+        variants.append((f"backEnd.serve x{n}", lambda port: [sys.executable, "-m", "backEnd.serve"],
+                         {"WEB_CONCURRENCY": str(n), "LOG_LEVEL": "warning"}))
+
+    results = []
+    for name, cmd, extra in variants:
+        walls, imports = [], []
+        for _ in range(args.runs):
+            env = {"DATABASE_URL": os.environ.get("DATABASE_URL") or sqlite_url("startup"), **extra}
+            wall, gauges = cold_start(cmd, env)
+            walls.append(wall)
+            imports.append(gauges.get("import", 0.0))
+        results.append({
+            "name": name, "runs": args.runs,
+            "ready_p50_ms": round(percentile(walls, 50) * 1000, 1),
+            "ready_min_ms": round(min(walls) * 1000, 1),
+            "import_p50_ms": round(percentile(imports, 50) * 1000, 1),
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(f"{r['name']:>26}  ready p50={r['ready_p50_ms']:>8}ms  min={r['ready_min_ms']:>8}ms  "
+                  f"app import p50={r['import_p50_ms']:>8}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/compare.py
+"""
+Diff two benchmarks/suite.py result files.
+
+    python benchmarks/compare.py base.json head.json --threshold 10
+
+Scenarios are matched by name. A scenario regresses when its throughput
+drops, or its p50/p99 grows, by more than --threshold percent; the exit
+status is 1 if anything regressed, so this can gate CI.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Optional
+
+# metric -> +1 if bigger is better, -1 if smaller is better
+METRICS = {"rps": 1, "p50_ms": -1, "p99_ms": -1}
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def change(base: float, head: float) -> Optional[float]:
+    return None if not base else (head - base) / base * 100
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    for key in ("target", "db_mode", "database", "cpus"):
+        if base["meta"].get(key) != head["meta"].get(key):
+            print(f"warning: {key} differs ({base['meta'].get(key)} vs {head['meta'].get(key)}); "
+                  "numbers are not comparable", file=sys.stderr)
+    base_by_name = {r["name"]: r for r in base["results"]}
+    rows, regressed = [], []
+    for r in head["results"]:
+        b = base_by_name.get(r["name"])
+        if b is None:
+            continue
+        row = {"name": r["name"]}
+        for metric, direction in METRICS.items():
+            pct = change(b[metric], r[metric])
+            row[metric] = {"base": b[metric], "head": r[metric], "change_pct": None if pct is None else round(pct, 1)}
+            if pct is not None and -direction * pct > args.threshold:
+                regressed.append(f"{r['name']} {metric}")
+        if r.get("errors", 0) > b.get("errors", 0):
+            regressed.append(f"{r['name']} errors")
+        rows.append(row)
+
+    if args.json:
+        print(json.dumps({"base": base["meta"].get("commit"), "head": head["meta"].get("commit"),
+                          "threshold_pct": args.threshold, "rows": rows, "regressions": regressed}, indent=2))
+    else:
+        print(f"base {str(base['meta'].get('commit'))[:10]}  head {str(head['meta'].get('commit'))[:10]}")
+        print(f"{'scenario':<34}" + "".join(f"{m:>26}" for m in METRICS))
+        for row in rows:
+            cells = []
+            for m in METRICS:
+                c = row[m]
+                pct = "n/a" if c["change_pct"] is None else f"{c['change_pct']:+.1f}%"
+                cells.append(f"{c['base']:>9} -> {c['head']:<9} {pct:>6}")
+            print(f"{row['name']:<34}" + "".join(f"{c:>26}" for c in cells))
+        for name in regressed:
+            print(f"REGRESSION: {name}")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
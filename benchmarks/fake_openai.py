@@ -0,0 +1,124 @@
+# benchmarks/fake_openai.py
+"""
+A tiny OpenAI-compatible server for local runs and benchmarks.
+
+    python benchmarks/fake_openai.py --port 9100 --ttft 0.3 --token-delay 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=fake uvicorn backEnd.main:app
+
+Implements POST /v1/chat/completions (plain and stream=true) and answers
+with `--tokens` words after the configured delays. `--fail-rate` makes that
+share of requests fail with `--fail-status` (429 carries Retry-After: 0) to
+exercise client retries. GET /stats reports how many completions were
+served, failed, and how many streams the client abandoned.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI()
+config: Dict[str, Any] = {"ttft": 0.2, "token_delay": 0.01, "tokens": 40, "fail_rate": 0.0, "fail_status": 500}
+stats = {"completions": 0, "streams": 0, "streams_abandoned": 0, "failures": 0}
+
+
+def _words(n: int):
+    return [f"word{i}" if i == 0 else f" word{i}" for i in range(n)]
+
+
+def _json_breakdown(body: Dict[str, Any]) -> str:
+    # answer /ai/breakdown/batch prompts: one entry per "[n] task" line
+    prompt = body["messages"][-1]["content"]
+    ids = [int(n) for n in re.findall(r"^\[(\d+)\]", prompt, flags=re.M)]
+    return json.dumps({"results": [{"id": n, "subtasks": [f"step {k} of task {n}" for k in range(1, 4)]} for n in ids]})
+
+
+def _chunk(cid: str, model: str, content: str = None, finish: str = None) -> str:
+    delta = {"content": content} if content is not None else {}
+    body = {
+        "id": cid, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+    return f"data: {json.dumps(body)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake")
+    cid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    words = _words(config["tokens"])
+
+    if random.random() < config["fail_rate"]:
+        stats["failures"] += 1
+        status = config["fail_status"]
+        return JSONResponse(
+            status_code=status,
+            content={"error": {"message": "injected failure", "type": "fake", "code": status}},
+            headers={"retry-after": "0"} if status == 429 else None,
+        )
+
+    if not body.get("stream"):
+        stats["completions"] += 1
+        wants_json = (body.get("response_format") or {}).get("type") == "json_object"
+        content = _json_breakdown(body) if wants_json else "".join(words)
+        await asyncio.sleep(config["ttft"] + config["token_delay"] * len(words))
+        return {
+            "id": cid, "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": len(words), "total_tokens": 10 + len(words)},
+        }
+
+    async def gen():
+        stats["streams"] += 1
+        finished = False
+        try:
+            await asyncio.sleep(config["ttft"])
+            for w in words:
+                yield _chunk(cid, model, w)
+                await asyncio.sleep(config["token_delay"])
+            yield _chunk(cid, model, finish="stop")
+            yield "data: [DONE]\n\n"
+            finished = True
+        finally:
+            if not finished:
+                stats["streams_abandoned"] += 1
+
+    return StreamingResponse(gen(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+def get_stats():
+    return {**stats, **config}
+
+
+@app.get("/health")
+def health():
+    return {"ok": True}
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--ttft", type=float, default=config["ttft"], help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=config["token_delay"])
+    parser.add_argument("--tokens", type=int, default=config["tokens"])
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests that fail, 0..1")
+    parser.add_argument("--fail-status", type=int, default=500)
+    args = parser.parse_args()
+    config.update(ttft=args.ttft, token_delay=args.token_delay, tokens=args.tokens,
+                  fail_rate=args.fail_rate, fail_status=args.fail_status)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
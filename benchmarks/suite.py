@@ -0,0 +1,267 @@
+# benchmarks/suite.py
+"""
+The reference benchmark: throughput and p50/p99 for every public route,
+with users holding 1, 1k and 100k todos, written as JSON so two commits
+can be compared with benchmarks/compare.py.
+
+    python benchmarks/suite.py --out base.json            # on main
+    python benchmarks/suite.py --out head.json            # on your branch
+    python benchmarks/compare.py base.json head.json
+
+--target uvicorn runs the API in a subprocess and talks HTTP to it;
+--target inprocess imports the app and drives it through httpx's ASGI
+transport (no sockets, so it isolates app cost from server cost).
+Uses --database-url / DATABASE_URL if set (e.g. a local Postgres),
+otherwise a fresh SQLite file. The AI routes run against
+benchmarks/fake_openai.py, so no API key or network is needed.
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from _common import REPO_ROOT, PASSWORD, serve, serve_fake_openai, drive, print_table, sqlite_url
+
+MESSAGES = [{"role": "user", "content": "Suggest 3 productive tasks for me today."}]
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+Request = Callable[[httpx.AsyncClient], Awaitable[Optional[httpx.Response]]]
+
+
+def size_label(n: int) -> str:
+    return f"{n // 1000}k" if n >= 1000 and n % 1000 == 0 else str(n)
+
+
+def git_meta() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, timeout=30).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {
+        "commit": git("rev-parse", "HEAD") or None,
+        "subject": git("log", "-1", "--format=%s") or None,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+# -------- targets --------
+
+# each yields (base_url, app); app is None when it runs in another process
+
+@contextlib.contextmanager
+def uvicorn_target(env: Dict[str, str]) -> Iterator[Tuple[str, Any]]:
+    with serve(env) as base:
+        yield base, None
+
+
+@contextlib.contextmanager
+def inprocess_target(env: Dict[str, str]) -> Iterator[Tuple[str, Any]]:
+    # the app reads its config at import time, so the env has to be in place first
+    os.environ.update({"OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "bench"), **env})
+    from backEnd.main import create_app
+    yield "http://bench", create_app()
+
+
+# -------- setup (not timed) --------
+
+async def login(client: httpx.AsyncClient, email: str) -> Dict[str, str]:
+    await client.post("/auth/signup", json={"email": email, "password": PASSWORD})
+    r = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def seed(client: httpx.AsyncClient, headers: Dict[str, str], n: int) -> List[int]:
+    """Create n todos through /todos/batch and return their ids."""
+    ids: List[int] = []
+    for start in range(0, n, 1000):
+        ops = [{"op": "create", "title": f"seed {i}", "done": i % 3 == 0} for i in range(start, min(n, start + 1000))]
+        r = await client.post("/todos/batch", json={"ops": ops}, headers=headers)
+        r.raise_for_status()
+        ids += [res["todo"]["id"] for res in r.json()["results"]]
+    return ids
+
+
+# -------- scenarios --------
+
+def auth_scenarios(run_id: str, login_email: str) -> List[Tuple[str, Request]]:
+    counter = itertools.count()
+
+    async def signup(c):
+        email = f"signup-{run_id}-{next(counter)}@bench.example.com"
+        return await c.post("/auth/signup", json={"email": email, "password": PASSWORD})
+
+    async def do_login(c):
+        return await c.post("/auth/login", json={"email": login_email, "password": PASSWORD})
+
+    return [("POST /auth/signup", signup), ("POST /auth/login", do_login)]
+
+
+def todo_scenarios(size: int, headers: Dict[str, str], ids: List[int]) -> List[Tuple[str, Request]]:
+    label = size_label(size)
+    rng = random.Random(size)
+    created: List[int] = []  # POST feeds DELETE, so the user's size stays put
+
+    async def get_page(c):
+        return await c.get("/todos", headers=headers)
+
+    async def post(c):
+        r = await c.post("/todos", json={"title": "bench"}, headers=headers)
+        if r.status_code == 201:
+            created.append(r.json()["id"])
+        return r
+
+    async def patch(c):
+        return await c.patch(f"/todos/{rng.choice(ids)}", json={"done": rng.random() < 0.5}, headers=headers)
+
+    async def delete(c):
+        if not created:
+            return None
+        return await c.delete(f"/todos/{created.pop()}", headers=headers)
+
+    return [
+        (f"GET /todos [{label}]", get_page),
+        (f"POST /todos [{label}]", post),
+        (f"PATCH /todos/{{id}} [{label}]", patch),
+        (f"DELETE /todos/{{id}} [{label}]", delete),
+    ]
+
+
+def ai_scenarios(headers: Dict[str, str]) -> List[Tuple[str, Request]]:
+    async def chat(c):
+        return await c.post("/ai/chat", json={"messages": MESSAGES}, headers=NO_CACHE)
+
+    async def chat_cached(c):
+        return await c.post("/ai/chat", json={"messages": MESSAGES})
+
+    async def chat_stream(c):
+        async with c.stream("POST", "/ai/chat/stream", json={"messages": MESSAGES}) as r:
+            await r.aread()  # latency is the whole stream
+            return r
+
+    async def breakdown(c):
+        return await c.post("/ai/breakdown", json={"task": "Plan a weekend trip"}, headers=NO_CACHE)
+
+    async def breakdown_batch(c):
+        tasks = [f"Plan project phase {i}" for i in range(10)]
+        return await c.post("/ai/breakdown/batch", json={"tasks": tasks}, headers=headers)
+
+    return [
+        ("POST /ai/chat", chat),
+        ("POST /ai/chat (cached)", chat_cached),
+        ("POST /ai/chat/stream", chat_stream),
+        ("POST /ai/breakdown", breakdown),
+        ("POST /ai/breakdown/batch [10]", breakdown_batch),
+    ]
+
+
+# -------- runner --------
+
+async def run(base: str, app, args) -> List[Dict[str, Any]]:
+    if app is None:
+        return await run_scenarios(base, None, args)
+    # ASGITransport doesn't send lifespan events; run startup/shutdown ourselves
+    async with app.router.lifespan_context(app):
+        return await run_scenarios(base, httpx.ASGITransport(app=app), args)
+
+
+async def run_scenarios(base: str, transport, args) -> List[Dict[str, Any]]:
+    run_id = uuid.uuid4().hex[:8]
+    selected = re.compile(args.only) if args.only else None
+    scenarios: List[Tuple[str, Request]] = []
+
+    async with httpx.AsyncClient(base_url=base, transport=transport, timeout=600) as setup:
+        login_email = f"login-{run_id}@bench.example.com"
+        login_headers = await login(setup, login_email)
+        scenarios += auth_scenarios(run_id, login_email)
+        for size in args.sizes:
+            if selected and not any(selected.search(name) for name, _ in todo_scenarios(size, {}, [])):
+                continue  # don't seed 100k rows for a scenario we won't run
+            headers = await login(setup, f"user-{size_label(size)}-{run_id}@bench.example.com")
+            t0 = time.perf_counter()
+            ids = await seed(setup, headers, size)
+            print(f"seeded {size} todos in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+            scenarios += todo_scenarios(size, headers, ids)
+        if not args.skip_ai:
+            scenarios += ai_scenarios(login_headers)
+
+    results = []
+    for name, request in scenarios:
+        if selected and not selected.search(name):
+            continue
+        concurrency = (args.ai_concurrency if name.startswith("POST /ai")
+                       else args.auth_concurrency if name.startswith("POST /auth") else args.concurrency)
+        r = await drive(name, request, base, concurrency, args.duration, transport=transport)
+        r["concurrency"] = concurrency
+        results.append(r)
+        print(f"{name}: {r['rps']} rps, p50 {r['p50_ms']}ms, p99 {r['p99_ms']}ms", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["uvicorn", "inprocess"], default="uvicorn")
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync", help="DB_MODE for the app")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--sizes", default="1,1000,100000", help="todos per user, comma separated")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--auth-concurrency", type=int, default=4, help="bcrypt-bound; above HASH_QUEUE_LIMIT you measure 429s")
+    parser.add_argument("--ai-concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--only", help="regex; run only scenarios whose name matches")
+    parser.add_argument("--skip-ai", action="store_true")
+    parser.add_argument("--ttft", default="0.05", help="fake OpenAI time to first token (s)")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--json", action="store_true", help="print results JSON instead of a table")
+    args = parser.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    database_url = args.database_url or sqlite_url(f"suite-{args.mode}")
+    target = uvicorn_target if args.target == "uvicorn" else inprocess_target
+
+    with contextlib.ExitStack() as stack:
+        env = {"DB_MODE": args.mode, "DATABASE_URL": database_url, "SLOW_REQUEST_MS": "0"}
+        if not args.skip_ai:
+            env["OPENAI_BASE_URL"] = stack.enter_context(serve_fake_openai("--ttft", args.ttft))
+        base, app = stack.enter_context(target(env))
+        started = time.time()
+        results = asyncio.run(run(base, app, args))
+
+    report = {
+        "meta": {
+            **git_meta(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(started)),
+            "target": args.target,
+            "db_mode": args.mode,
+            "database": database_url.split(":", 1)[0],
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("out", "json", "database_url")},
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
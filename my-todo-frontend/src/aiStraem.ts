@@ -1,4 +1,6 @@
 // src/aiStream.ts
+// Reads the server-sent events from POST /ai/chat/stream: one `data: "<token>"`
+// frame per token (JSON-encoded so spaces/newlines survive), then `data: [DONE]`.
 export async function askAIStream(baseURL: string, prompt: string, onChunk: (t: string)=>void) {
   const res = await fetch(`${baseURL}/ai/chat/stream`, {
     method: "POST",
@@ -10,6 +12,7 @@ export async function askAIStream(baseURL: string, prompt: string, onChunk: (t:
       ],
     }),
   });
+  if (!res.ok) throw new Error(`AI stream failed: ${res.status}`);
 
   const reader = res.body!.getReader();
   const decoder = new TextDecoder();
@@ -18,13 +21,20 @@ export async function askAIStream(baseURL: string, prompt: string, onChunk: (t:
     const { value, done } = await reader.read();
     if (done) break;
     buf += decoder.decode(value, { stream: true });
-    // split SSE frames
-    for (const line of buf.split("\n\n")) {
-      if (!line.startsWith("data:")) continue;
-      const chunk = line.slice(5).trim();
-      if (chunk === "[DONE]") return;
-      onChunk(chunk);
+    // split SSE frames; the last piece may be a partial frame, keep it for the next read
+    const frames = buf.split("\n\n");
+    buf = frames.pop() ?? "";
+    for (const frame of frames) {
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (!data) continue;
+      if (data === "[DONE]") return;
+      if (event === "error") throw new Error(JSON.parse(data));
+      onChunk(JSON.parse(data));
     }
-    buf = "";
   }
 }
@@ -5,8 +5,11 @@ import { useAuth } from "../AuthContext";
 import Spinner from "../Spinner";
 
 type Todo = { id: number; title: string; done: boolean };
+type TodoPage = { items: Todo[]; next_cursor: number | null };
 type Filter = "all" | "active" | "done";
 
+const BATCH_MAX = 1000; // server-side TODO_BATCH_MAX for /todos/batch
+
 export default function Home() {
   // Data
   const [todos, setTodos] = useState<Todo[]>([]);
@@ -47,10 +50,23 @@ export default function Home() {
     }
   }, [dark]);
 
-  // Fetch todos
+  // Fetch todos (the API is cursor-paginated, so follow next_cursor to the end)
   useEffect(() => {
-    api.get<Todo[]>("/todos")
-      .then((res) => setTodos(res.data))
+    const fetchAll = async () => {
+      const all: Todo[] = [];
+      let after: number | null = null;
+      do {
+        const res: { data: TodoPage } = await api.get<TodoPage>("/todos", {
+          params: { limit: 500, ...(after !== null ? { after } : {}) },
+        });
+        all.push(...res.data.items);
+        after = res.data.next_cursor;
+      } while (after !== null);
+      return all;
+    };
+
+    fetchAll()
+      .then(setTodos)
       .catch((err) => {
         console.error("Failed to fetch todos", err);
         if (err?.response?.status === 401) {
@@ -89,10 +105,23 @@ export default function Home() {
       .catch((err) => console.error("Failed to delete todo", err));
   };
 
-  const clearCompleted = () => {
+  const clearCompleted = async () => {
     const completed = todos.filter((t) => t.done);
+    if (completed.length === 0) return;
     setTodos((prev) => prev.filter((t) => !t.done));
-    completed.forEach((t) => deleteTodo(t.id));
+    // one request / one transaction per BATCH_MAX todos instead of a DELETE per todo
+    for (let i = 0; i < completed.length; i += BATCH_MAX) {
+      const chunk = completed.slice(i, i + BATCH_MAX);
+      try {
+        await api.post("/todos/batch", { ops: chunk.map((t) => ({ op: "delete", id: t.id })) });
+      } catch (err) {
+        console.error("Failed to clear completed todos", err);
+        // this chunk and the ones after it were not deleted: put them back
+        const kept = completed.slice(i);
+        setTodos((prev) => [...prev, ...kept].sort((a, b) => a.id - b.id));
+        return;
+      }
+    }
   };
 
   // AI: Suggest tasks